@@ -10,18 +10,53 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    from app.db_engine import engine_options, install_sqlite_pragmas
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+
     db.init_app(app)
     login_manager.init_app(app)
 
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config)
+
+    # fail fast on missing Twilio settings instead of on the first send
+    from app.services.twilio_client import validate_transport_config
+    validate_transport_config()
+
+    # registered first so a profile covers the other request hooks too
+    from app.profiling import init_profiling
+    init_profiling(app)
+
     from app.routes.auth import auth_bp
     from app.routes.admin import admin_bp
     from app.routes.cron import cron_bp
+    from app.routes.calendar import calendar_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(cron_bp)
-
-    with app.app_context():
-        db.create_all()
+    app.register_blueprint(calendar_bp)
+
+    from app.services.feed_versions import install_feed_version_hooks
+    install_feed_version_hooks()
+
+    if app.config["QUERY_STATS_ENABLED"]:
+        from app.query_stats import init_query_stats
+        with app.app_context():
+            init_query_stats(app, db.engine)
+
+    # schema setup is an explicit step (python -m scripts.migrate or
+    # flask init-db); DB_AUTO_INIT=1 restores doing it on every start
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create missing tables and apply pending migrations."""
+        from app.migrations import init_db
+        applied = init_db()
+        print(f"✅ Database ready (applied migrations: {applied or 'none'}).")
+
+    if app.config["DB_AUTO_INIT"]:
+        from app.migrations import init_db
+        with app.app_context():
+            init_db()
 
     return app
@@ -5,12 +5,103 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///../instance/app.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # SQLite connection pragmas (app/db_engine.py)
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # negative = KiB, positive = pages
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-20000"))
+
+    # connection pool for server databases (PostgreSQL, MySQL)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
     ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
     ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_WHATSAPP_FROM = os.getenv("TWILIO_WHATSAPP_FROM")
+    TWILIO_POOL_SIZE = int(os.getenv("TWILIO_POOL_SIZE", os.getenv("REMINDER_CONCURRENCY", "8")))
+    TWILIO_TIMEOUT = float(os.getenv("TWILIO_TIMEOUT", "10"))
+
+    # shown in reminder messages ("Drop a message in '<house>' group chat")
+    HOUSE_NAME = os.getenv("HOUSE_NAME", "44 Perivale Cres")
+    # JSON file of message templates, defaults to app/message_templates.json
+    MESSAGE_TEMPLATES_PATH = os.getenv("MESSAGE_TEMPLATES_PATH")
 
     CRON_SECRET = os.getenv("CRON_SECRET", "super-secret")
+    # processes used to fan cron work out across households (1 = in-process)
+    CRON_WORKERS = int(os.getenv("CRON_WORKERS", "1"))
+
+    # calendar feeds (/calendar/...ics): weeks of history, weeks of pickup
+    # dates ahead, rendered feeds kept in memory, client cache lifetime
+    ICS_PAST_WEEKS = int(os.getenv("ICS_PAST_WEEKS", "4"))
+    ICS_FUTURE_WEEKS = int(os.getenv("ICS_FUTURE_WEEKS", "12"))
+    ICS_CACHE_SIZE = int(os.getenv("ICS_CACHE_SIZE", "256"))
+    ICS_MAX_AGE_SECONDS = int(os.getenv("ICS_MAX_AGE_SECONDS", "900"))
+
+    # rows per page in the admin history views
+    HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+
+    # event-driven scheduler (python -m scripts.scheduler, or a thread of
+    # the web app with EVENT_SCHEDULER_IN_PROCESS=1); weekly generation
+    # runs at GENERATION_WEEKDAY (0 = Monday) GENERATION_HOUR:00
+    EVENT_SCHEDULER_IN_PROCESS = os.getenv("EVENT_SCHEDULER_IN_PROCESS", "0") == "1"
+    EVENT_SCHEDULER_MAX_SLEEP_SECONDS = float(os.getenv("EVENT_SCHEDULER_MAX_SLEEP_SECONDS", "300"))
+    GENERATION_WEEKDAY = int(os.getenv("GENERATION_WEEKDAY", "0"))
+    GENERATION_HOUR = int(os.getenv("GENERATION_HOUR", "0"))
+
+    # assignment picking: "greedy" (chore by chore) or "optimal" (whole-week matching)
+    SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "greedy")
+
+    # /cron/generate-assignments-horizon?weeks=N
+    PLANNING_HORIZON_WEEKS = int(os.getenv("PLANNING_HORIZON_WEEKS", "4"))
+    PLANNING_HORIZON_MAX_WEEKS = int(os.getenv("PLANNING_HORIZON_MAX_WEEKS", "26"))
     WHATSAPP_MODE = os.getenv("WHATSAPP_MODE", "fake")
+
+    # reminder dispatch: "concurrent" (thread pool), "sequential" or "outbox"
+    REMINDER_DISPATCH_MODE = os.getenv("REMINDER_DISPATCH_MODE", "concurrent")
+    REMINDER_CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "8"))
+
+    # compiled reminder-rule index is rebuilt on chore edits in this process,
+    # and at least this often to pick up edits made by other workers
+    REMINDER_INDEX_TTL_SECONDS = int(os.getenv("REMINDER_INDEX_TTL_SECONDS", "300"))
+
+    # cron work claimed by one worker is skipped by others for this long
+    # (only matters if that worker dies before releasing it)
+    JOB_LEASE_TTL_SECONDS = int(os.getenv("JOB_LEASE_TTL_SECONDS", "900"))
+
+    # a reminder run also sends slots it missed since the previous run, up
+    # to this many hours back (0 = only the current hour, no catch-up)
+    REMINDER_CATCHUP_HOURS = int(os.getenv("REMINDER_CATCHUP_HOURS", "24"))
+    # failed sends hold the watermark back so later runs retry them, for
+    # at most this many hours; older slots are then given up
+    REMINDER_RETRY_HOURS = int(os.getenv("REMINDER_RETRY_HOURS", "6"))
+
+    # outbox worker (scripts/outbox_worker.py)
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+    OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+    OUTBOX_LOCK_TIMEOUT_SECONDS = int(os.getenv("OUTBOX_LOCK_TIMEOUT_SECONDS", "300"))
+    OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+
+    # per-request / per-cron-run SQL statement counts and timings
+    QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "1") == "1"
+    QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "1") == "1"
+    # requests spending longer than this in SQL are logged as warnings
+    QUERY_STATS_SLOW_MS = float(os.getenv("QUERY_STATS_SLOW_MS", "500"))
+
+    # create tables / run migrations inside create_app() (slow cold starts);
+    # otherwise run `python -m scripts.migrate` on deploy
+    DB_AUTO_INIT = os.getenv("DB_AUTO_INIT", "0") == "1"
+
+    # opt-in cProfile capture (X-Profile header or ?_profile=, see app/profiling.py)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+    PROFILE_SECRET = os.getenv("PROFILE_SECRET", "")   # falls back to CRON_SECRET
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
@@ -0,0 +1,80 @@
+"""
+Engine options from Config, per database backend.
+
+SQLite: every new connection gets the journal_mode / synchronous /
+busy_timeout / cache_size pragmas. WAL lets readers and one writer work
+at the same time instead of failing with "database is locked".
+
+Server databases (PostgreSQL, MySQL): pool size, overflow, pre-ping and
+recycle go to create_engine() through SQLALCHEMY_ENGINE_OPTIONS.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == "sqlite"
+
+
+def engine_options(config) -> dict:
+    """
+    config: a mapping with the DB_* / SQLITE_* keys (app.config or a dict).
+    Options already set in SQLALCHEMY_ENGINE_OPTIONS win.
+    """
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+
+    if is_sqlite(uri):
+        # pysqlite's own lock wait, in seconds (the pragma below covers
+        # the rest of SQLite's busy handling)
+        options = {"connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000}}
+    else:
+        options = {
+            "pool_size": config["DB_POOL_SIZE"],
+            "max_overflow": config["DB_MAX_OVERFLOW"],
+            "pool_timeout": config["DB_POOL_TIMEOUT"],
+            "pool_recycle": config["DB_POOL_RECYCLE"],
+            "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        }
+
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def sqlite_pragmas(config) -> list:
+    journal_mode = config["SQLITE_JOURNAL_MODE"].upper()
+    synchronous = config["SQLITE_SYNCHRONOUS"].upper()
+
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise Exception(f"SQLITE_JOURNAL_MODE must be one of {', '.join(sorted(SQLITE_JOURNAL_MODES))}")
+    if synchronous not in SQLITE_SYNCHRONOUS:
+        raise Exception(f"SQLITE_SYNCHRONOUS must be one of {', '.join(sorted(SQLITE_SYNCHRONOUS))}")
+
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+    ]
+
+
+def install_sqlite_pragmas(engine, config):
+    """
+    Runs the pragmas on every new DBAPI connection of a SQLite engine.
+    No-op for other backends.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
@@ -0,0 +1,206 @@
+"""
+In-process metrics, rendered in the Prometheus text format at /cron/metrics.
+
+Counters and histograms are updated on the hot paths, so an update is a
+dict lookup and an add under a per-metric lock. Gauges that need the
+database are read through a callback only when the endpoint is scraped.
+
+Values live in the process that recorded them: with several gunicorn
+workers (or CRON_WORKERS > 1) each process keeps its own numbers.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labels)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in sorted(items)]
+
+    def render(self) -> list:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """
+    Either set() directly or give a callback returning the current value,
+    which is only called when rendering.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), callback=None):
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> list:
+        if self.callback is not None:
+            self.set(self.callback())
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, labels: tuple = ()):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last one is +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][i] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> list:
+        with self._lock:
+            items = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+
+        lines = []
+        for key, (counts, total) in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: tuple = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labels, callback))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple, labels: tuple = ()) -> Histogram:
+        return self.register(Histogram(name, help_text, buckets, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+MESSAGES_SENT = registry.counter(
+    "chores_messages_sent_total", "WhatsApp messages sent, by dispatch mode.", ("mode",)
+)
+MESSAGES_FAILED = registry.counter(
+    "chores_messages_failed_total", "WhatsApp sends that raised, by dispatch mode.", ("mode",)
+)
+REMINDER_WATERMARK_HELD = registry.counter(
+    "chores_reminder_watermark_held_total",
+    "Reminder runs whose failed sends held the catch-up watermark back, by household.", ("household",)
+)
+SEND_LATENCY = registry.histogram(
+    "chores_whatsapp_send_seconds", "send_whatsapp_message latency, by transport.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10), labels=("transport",),
+)
+CRON_DURATION = registry.histogram(
+    "chores_cron_request_seconds", "Cron endpoint duration, by endpoint.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120), labels=("endpoint",),
+)
+
+
+def _pending_assignments() -> int:
+    from app.models import Assignment
+    return Assignment.query.filter(Assignment.status == "pending").count()
+
+
+def _outbox_depth() -> int:
+    from app.services.outbox import outbox_depth
+    return outbox_depth()
+
+
+PENDING_ASSIGNMENTS = registry.gauge(
+    "chores_pending_assignments", "Assignments with status pending.", callback=_pending_assignments
+)
+OUTBOX_DEPTH = registry.gauge(
+    "chores_outbox_depth", "Outbox messages pending or being sent.", callback=_outbox_depth
+)
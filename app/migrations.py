@@ -0,0 +1,204 @@
+"""
+Lightweight versioned migrations.
+
+db.create_all() only creates missing tables, it never alters existing
+ones. Schema changes for existing databases go here as numbered steps;
+each runs once and is recorded in the schema_migrations table.
+Keep the statements idempotent (IF NOT EXISTS) so they are safe on a
+database that create_all() just built from the current models.
+"""
+from datetime import datetime
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateTable
+from app.config import Config
+from app.extensions import db
+
+
+def _add_column_if_missing(table: str, column: str, ddl: str):
+    columns = {c["name"] for c in inspect(db.session.connection()).get_columns(table)}
+    if column not in columns:
+        db.session.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+
+
+def _drop_global_chore_name_unique():
+    """
+    Chore names used to be unique across the whole deployment; they are
+    now unique per household.
+    """
+    from app.models import Chore, Household
+
+    conn = db.session.connection()
+    uniques = inspect(conn).get_unique_constraints("chore")
+    old = [u for u in uniques if u["column_names"] == ["name"]]
+    if not old:
+        return
+
+    if conn.dialect.name == "sqlite":
+        # SQLite can't drop a constraint: rebuild the table from the model
+        metadata = MetaData()
+        Household.__table__.to_metadata(metadata)
+        new_table = Chore.__table__.to_metadata(metadata, name="chore__new")
+        cols = ", ".join(c.name for c in Chore.__table__.columns)
+        db.session.execute(CreateTable(new_table))
+        db.session.execute(text(f"INSERT INTO chore__new ({cols}) SELECT {cols} FROM chore"))
+        db.session.execute(text("DROP TABLE chore"))
+        db.session.execute(text("ALTER TABLE chore__new RENAME TO chore"))
+        return
+
+    for u in old:
+        db.session.execute(text(f"ALTER TABLE chore DROP CONSTRAINT {u['name']}"))
+    db.session.execute(text(
+        "ALTER TABLE chore ADD CONSTRAINT uq_household_chore_name UNIQUE (household_id, name)"
+    ))
+
+
+def _households():
+    _add_column_if_missing("user", "household_id", "INTEGER REFERENCES household(id)")
+    _add_column_if_missing("chore", "household_id", "INTEGER REFERENCES household(id)")
+    _add_column_if_missing("assignment", "household_id", "INTEGER REFERENCES household(id)")
+    _drop_global_chore_name_unique()
+
+    # everything that existed before tenancy belongs to one default household
+    household_id = db.session.execute(text("SELECT MIN(id) FROM household")).scalar()
+    if household_id is None:
+        db.session.execute(
+            text("INSERT INTO household (name, group_chat_name, is_active, created_at) VALUES (:n, :g, :a, :t)"),
+            {"n": Config.HOUSE_NAME, "g": Config.HOUSE_NAME, "a": True, "t": datetime.now()},
+        )
+        household_id = db.session.execute(text("SELECT MIN(id) FROM household")).scalar()
+
+    db.session.execute(text('UPDATE "user" SET household_id = :h WHERE household_id IS NULL'), {"h": household_id})
+    db.session.execute(text("UPDATE chore SET household_id = :h WHERE household_id IS NULL"), {"h": household_id})
+    db.session.execute(text(
+        "UPDATE assignment SET household_id = "
+        "(SELECT chore.household_id FROM chore WHERE chore.id = assignment.chore_id) "
+        "WHERE household_id IS NULL"
+    ))
+
+
+def _feed_versions():
+    for table in ("user", "household"):
+        _add_column_if_missing(table, "feed_version", "INTEGER NOT NULL DEFAULT 0")
+        _add_column_if_missing(table, "feed_updated_at", "TIMESTAMP")
+
+
+def _outbox_claim_token():
+    _add_column_if_missing("outbox_message", "locked_by", "VARCHAR(64)")
+
+
+def _reminder_log_status():
+    _add_column_if_missing("reminder_log", "status", "VARCHAR(20) NOT NULL DEFAULT 'sent'")
+
+
+MIGRATIONS = [
+    (
+        1,
+        "hot path indexes",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_assignment_week_status ON assignment (week_start_date, status)",
+            "CREATE INDEX IF NOT EXISTS ix_assignment_chore_week ON assignment (chore_id, week_start_date)",
+            "CREATE INDEX IF NOT EXISTS ix_assignment_user_chore_week ON assignment (user_id, chore_id, week_start_date)",
+            "CREATE INDEX IF NOT EXISTS ix_assignment_status_due ON assignment (status, due_date)",
+            "CREATE INDEX IF NOT EXISTS ix_absence_user_start ON absence (user_id, start_date)",
+            "CREATE INDEX IF NOT EXISTS ix_outbox_status_next_attempt ON outbox_message (status, next_attempt_at)",
+        ],
+    ),
+    (
+        2,
+        "households",
+        [
+            _households,
+            'CREATE INDEX IF NOT EXISTS ix_user_household_id ON "user" (household_id)',
+            "CREATE INDEX IF NOT EXISTS ix_chore_household_id ON chore (household_id)",
+            "CREATE INDEX IF NOT EXISTS ix_assignment_household_week ON assignment (household_id, week_start_date, status)",
+        ],
+    ),
+    (
+        3,
+        "calendar feed versions",
+        [_feed_versions],
+    ),
+    (
+        4,
+        "history pagination indexes",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_assignment_household_week_id ON assignment (household_id, week_start_date, id)",
+            "CREATE INDEX IF NOT EXISTS ix_assignment_household_status_week_id ON assignment (household_id, status, week_start_date, id)",
+            "CREATE INDEX IF NOT EXISTS ix_assignment_user_week_id ON assignment (user_id, week_start_date, id)",
+            "CREATE INDEX IF NOT EXISTS ix_reminder_log_sent_id ON reminder_log (sent_at, id)",
+        ],
+    ),
+    (
+        5,
+        "outbox claim token",
+        [_outbox_claim_token],
+    ),
+    (
+        6,
+        "reminder log status",
+        [_reminder_log_status],
+    ),
+]
+
+
+def _ensure_version_table():
+    db.session.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def current_version() -> int:
+    _ensure_version_table()
+    version = db.session.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar()
+    return version or 0
+
+
+def upgrade() -> list:
+    """
+    Applies pending migrations in order, each in its own transaction.
+    Returns the versions applied.
+    """
+    applied = []
+    version = current_version()
+    db.session.commit()
+
+    for number, description, statements in MIGRATIONS:
+        if number <= version:
+            continue
+
+        try:
+            for stmt in statements:
+                if callable(stmt):
+                    stmt()
+                else:
+                    db.session.execute(text(stmt))
+
+            db.session.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": number, "d": description, "t": datetime.now()},
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        applied.append(number)
+
+    return applied
+
+
+def init_db() -> list:
+    """
+    Creates missing tables, applies pending migrations and creates the
+    default household if there is none. Run explicitly (python -m
+    scripts.migrate or flask init-db), not on every app start.
+    """
+    from app.services.households import ensure_default_household
+
+    db.create_all()
+    applied = upgrade()
+    ensure_default_household()
+    return applied
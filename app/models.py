@@ -19,17 +19,37 @@ def load_user(user_id):
     return None
 
 
+class Household(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+
+    # shown in reminder messages ("Drop a message in '<group chat>' group chat")
+    group_chat_name = db.Column(db.String(120), nullable=True)
+
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+
+    # bumped whenever its calendar feed content changes (ETag / Last-Modified)
+    feed_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    feed_updated_at = db.Column(db.DateTime, nullable=True)
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), nullable=True, index=True)
     name = db.Column(db.String(120), nullable=False)
     phone_e164 = db.Column(db.String(32), nullable=False, unique=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    feed_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    feed_updated_at = db.Column(db.DateTime, nullable=True)
+
 
 class Chore(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(120), nullable=False, unique=True)
+    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), nullable=True, index=True)
+    name = db.Column(db.String(120), nullable=False)
 
     # weekly or biweekly
     frequency_type = db.Column(db.String(20), nullable=False)
@@ -42,10 +62,17 @@ class Chore(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    __table_args__ = (
+        db.UniqueConstraint("household_id", "name", name="uq_household_chore_name"),
+    )
+
 
 class Assignment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
+    # copied from the chore so per-household scans don't need a join
+    household_id = db.Column(db.Integer, db.ForeignKey("household.id"), nullable=True)
+
     chore_id = db.Column(db.Integer, db.ForeignKey("chore.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
 
@@ -61,6 +88,18 @@ class Assignment(db.Model):
     chore = db.relationship("Chore")
     user = db.relationship("User")
 
+    __table_args__ = (
+        db.Index("ix_assignment_household_week", "household_id", "week_start_date", "status"),
+        db.Index("ix_assignment_week_status", "week_start_date", "status"),
+        db.Index("ix_assignment_chore_week", "chore_id", "week_start_date"),
+        db.Index("ix_assignment_user_chore_week", "user_id", "chore_id", "week_start_date"),
+        db.Index("ix_assignment_status_due", "status", "due_date"),
+        # keyset pagination of the history views
+        db.Index("ix_assignment_household_week_id", "household_id", "week_start_date", "id"),
+        db.Index("ix_assignment_household_status_week_id", "household_id", "status", "week_start_date", "id"),
+        db.Index("ix_assignment_user_week_id", "user_id", "week_start_date", "id"),
+    )
+
 
 class Debt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -89,6 +128,10 @@ class Absence(db.Model):
 
     user = db.relationship("User")
 
+    __table_args__ = (
+        db.Index("ix_absence_user_start", "user_id", "start_date"),
+    )
+
 
 class ReminderLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -99,10 +142,14 @@ class ReminderLog(db.Model):
     # monday / thursday / etc
     reminder_key = db.Column(db.String(50), nullable=False)
 
+    # sent / rejected (permanent send error: never retried)
+    status = db.Column(db.String(20), nullable=False, default="sent", server_default="sent")
+
     assignment = db.relationship("Assignment")
 
     __table_args__ = (
         db.UniqueConstraint("assignment_id", "reminder_key", name="uq_assignment_reminder"),
+        db.Index("ix_reminder_log_sent_id", "sent_at", "id"),
     )
 
 
@@ -118,3 +165,65 @@ class ChoreUserExclusion(db.Model):
     __table_args__ = (
         db.UniqueConstraint("chore_id", "user_id", name="uq_chore_user_exclusion"),
     )
+
+
+class OutboxMessage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+
+    assignment_id = db.Column(db.Integer, db.ForeignKey("assignment.id"), nullable=True)
+    reminder_key = db.Column(db.String(50), nullable=True)
+
+    to_e164 = db.Column(db.String(32), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    # pending / sending / sent / failed
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    # token of the worker that claimed it (see outbox.claim_batch)
+    locked_by = db.Column(db.String(64), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    assignment = db.relationship("Assignment")
+
+    __table_args__ = (
+        db.UniqueConstraint("assignment_id", "reminder_key", name="uq_outbox_assignment_reminder"),
+        db.Index("ix_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class JobLease(db.Model):
+    """
+    A claim on one unit of cron work (e.g. "reminder:<assignment>:<rule>").
+    Taken with an insert that ignores conflicts, so only one worker wins;
+    expired leases (a crashed run) can be taken over.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+
+    job_key = db.Column(db.String(200), nullable=False)
+    holder = db.Column(db.String(100), nullable=False)
+
+    claimed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("job_key", name="uq_job_lease_key"),
+        db.Index("ix_job_lease_holder", "holder"),
+        db.Index("ix_job_lease_expires", "expires_at"),
+    )
+
+
+class Watermark(db.Model):
+    """
+    How far a recurring job has got, e.g. "reminders:<household>" = the
+    last moment whose reminder slots were evaluated.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    value = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
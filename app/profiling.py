@@ -0,0 +1,129 @@
+"""
+Opt-in cProfile capture for single requests.
+
+With PROFILING_ENABLED=1, a request carrying the profiling secret
+
+    curl -H "X-Profile: $PROFILE_SECRET" -X POST .../cron/send-reminders
+    /admin/?_profile=<secret>
+
+is run under cProfile and the stats are written to PROFILE_DIR as
+<endpoint>-<timestamp>.prof (readable with pstats or snakeviz). Only the
+newest PROFILE_KEEP files are kept. With PROFILING_ENABLED=0 no hooks are
+registered at all.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import re
+from datetime import datetime
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".prof"
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def profile_dir(app) -> str:
+    path = app.config["PROFILE_DIR"]
+    if not os.path.isabs(path):
+        path = os.path.join(app.root_path, os.pardir, path)
+    return os.path.normpath(path)
+
+
+def _requested(secret: str) -> bool:
+    given = request.headers.get("X-Profile") or request.args.get("_profile")
+    return bool(given and secret and hmac.compare_digest(given, secret))
+
+
+def _prune(directory: str, keep: int):
+    files = sorted(
+        (f for f in os.listdir(directory) if f.endswith(PROFILE_SUFFIX)),
+        key=lambda f: os.path.getmtime(os.path.join(directory, f)),
+    )
+    for name in files[:-keep] if keep > 0 else []:
+        os.remove(os.path.join(directory, name))
+
+
+def init_profiling(app):
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    secret = app.config.get("PROFILE_SECRET") or app.config.get("CRON_SECRET")
+    directory = profile_dir(app)
+    os.makedirs(directory, exist_ok=True)
+
+    @app.before_request
+    def _start_profile():
+        if not _requested(secret):
+            return
+        g._profiler = cProfile.Profile()
+        g._profiler.enable()
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        profiler = g.pop("_profiler", None)
+        if profiler is None:
+            return
+        profiler.disable()
+
+        endpoint = _SAFE_NAME.sub("_", request.endpoint or request.path.strip("/") or "root")
+        name = f"{endpoint}-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}{PROFILE_SUFFIX}"
+        try:
+            profiler.dump_stats(os.path.join(directory, name))
+            _prune(directory, app.config.get("PROFILE_KEEP", 50))
+            logger.info("Wrote profile %s", name)
+        except OSError:
+            logger.exception("Could not write profile %s", name)
+
+
+def list_profiles(directory: str, limit: int = 50) -> list:
+    """
+    Newest first: [{"name", "endpoint", "created_at", "size"}, ...]
+    """
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        profiles.append({
+            "name": name,
+            "endpoint": name.rsplit("-", 1)[0],
+            "created_at": datetime.fromtimestamp(stat.st_mtime),
+            "size": stat.st_size,
+        })
+
+    profiles.sort(key=lambda p: p["created_at"], reverse=True)
+    return profiles[:limit]
+
+
+def top_functions(path: str, limit: int = 15, sort: str = "cumulative") -> dict:
+    """
+    Summary of one profile: total calls and time, plus the top functions
+    by `sort` ("cumulative" or "tottime").
+    """
+    stats = pstats.Stats(path)
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "function": f"{func} ({os.path.basename(filename)}:{line})" if line else func,
+            "path": filename,
+            "calls": nc,
+            "primitive_calls": cc,
+            "tottime_ms": tt * 1000,
+            "cumtime_ms": ct * 1000,
+        })
+
+    key = "tottime_ms" if sort == "tottime" else "cumtime_ms"
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return {
+        "total_calls": stats.total_calls,
+        "total_ms": stats.total_tt * 1000,
+        "functions": rows[:limit],
+    }
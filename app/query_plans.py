@@ -0,0 +1,149 @@
+"""
+EXPLAIN checks for the hot query paths.
+
+Each entry builds a query the app runs often and names the table that must
+be reached through an index. check_query_plans() fails when the planner
+falls back to a full table scan on it, e.g. after an index was dropped or a
+query changed shape.
+"""
+from datetime import date, datetime
+from sqlalchemy import case, func, text
+from app.extensions import db
+from app.models import Assignment, Absence, ReminderLog, OutboxMessage
+from app.services.history import beyond_cursor
+
+
+def _hot_queries():
+    week = date(2026, 2, 2)
+
+    return [
+        (
+            "pending assignments for week (reminders)",
+            "assignment",
+            db.session.query(Assignment.id)
+            .filter(Assignment.week_start_date == week, Assignment.status == "pending"),
+        ),
+        (
+            "household assignments for week (scheduler, dashboard, reminders)",
+            "assignment",
+            db.session.query(Assignment.id)
+            .filter(Assignment.household_id == 1, Assignment.week_start_date == week),
+        ),
+        (
+            "assignments for week (scheduler, dashboard)",
+            "assignment",
+            db.session.query(Assignment.id).filter(Assignment.week_start_date == week),
+        ),
+        (
+            "assignment for (chore, week)",
+            "assignment",
+            db.session.query(Assignment.id)
+            .filter(Assignment.chore_id == 1, Assignment.week_start_date == week),
+        ),
+        (
+            "last assignment per (user, chore) (fairness)",
+            "assignment",
+            db.session.query(
+                Assignment.user_id, Assignment.chore_id, func.max(Assignment.week_start_date)
+            ).group_by(Assignment.user_id, Assignment.chore_id),
+        ),
+        (
+            "monthly done/missed per user (dashboard)",
+            "assignment",
+            db.session.query(
+                Assignment.user_id,
+                func.sum(case((Assignment.status == "done", 1), else_=0)),
+            )
+            .filter(Assignment.status.in_(["done", "missed"]), Assignment.due_date >= week)
+            .group_by(Assignment.user_id),
+        ),
+        (
+            "absences for user",
+            "absence",
+            db.session.query(Absence.start_date, Absence.end_date).filter(Absence.user_id == 1),
+        ),
+        (
+            "reminder logs for assignments",
+            "reminder_log",
+            db.session.query(ReminderLog.reminder_key).filter(ReminderLog.assignment_id.in_([1, 2, 3])),
+        ),
+        (
+            "assignment history page (admin)",
+            "assignment",
+            db.session.query(Assignment.id)
+            .filter(Assignment.household_id == 1)
+            .filter(beyond_cursor(Assignment.week_start_date, Assignment.id, week, 500, older=True))
+            .order_by(Assignment.week_start_date.desc(), Assignment.id.desc()).limit(50),
+        ),
+        (
+            "assignment history page by status (admin)",
+            "assignment",
+            db.session.query(Assignment.id)
+            .filter(Assignment.household_id == 1, Assignment.status == "missed")
+            .filter(beyond_cursor(Assignment.week_start_date, Assignment.id, week, 500, older=True))
+            .order_by(Assignment.week_start_date.desc(), Assignment.id.desc()).limit(50),
+        ),
+        (
+            "reminder log history page (admin)",
+            "reminder_log",
+            db.session.query(ReminderLog.id)
+            .filter(beyond_cursor(ReminderLog.sent_at, ReminderLog.id, datetime(2026, 2, 2), 500, older=True))
+            .order_by(ReminderLog.sent_at.desc(), ReminderLog.id.desc()).limit(50),
+        ),
+        (
+            "due outbox messages",
+            "outbox_message",
+            db.session.query(OutboxMessage.id)
+            .filter(OutboxMessage.status == "pending", OutboxMessage.next_attempt_at <= datetime(2026, 2, 2)),
+        ),
+    ]
+
+
+def _compile(query) -> str:
+    dialect = db.session.get_bind().dialect
+    return str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _sqlite_full_scans(sql: str, table: str) -> tuple:
+    """
+    (full scan lines, whole plan)
+    """
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    details = [row[-1] for row in rows]
+    # "SCAN assignment" is a table scan; "SCAN assignment USING (COVERING) INDEX"
+    # walks an index and "SEARCH ..." is an index lookup
+    return [
+        d for d in details
+        if d.startswith(f"SCAN {table}") and "USING" not in d
+    ], details
+
+
+def _postgres_full_scans(sql: str, table: str) -> tuple:
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    details = [row[0] for row in db.session.execute(text(f"EXPLAIN {sql}")).all()]
+    return [d for d in details if f"Seq Scan on {table}" in d], details
+
+
+def check_query_plans() -> list:
+    """
+    Returns [(name, plan lines)] for every hot query that full-scans its
+    table. Empty list means all good.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        explain = _sqlite_full_scans
+    elif dialect == "postgresql":
+        explain = _postgres_full_scans
+    else:
+        raise RuntimeError(f"Query plan check does not support {dialect}.")
+
+    failures = []
+    try:
+        for name, table, query in _hot_queries():
+            scans, details = explain(_compile(query), table)
+            if scans:
+                failures.append((name, details))
+    finally:
+        db.session.rollback()
+
+    return failures
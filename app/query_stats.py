@@ -0,0 +1,143 @@
+"""
+SQL statement counting and timing.
+
+Engine event hooks feed whatever QueryStats is active in the current
+context: one per Flask request (exposed as X-Query-Count / X-Query-Time-Ms
+headers and a log line) and one per cron task or worker batch via
+track_queries(). query_budget() turns the same numbers into a guard for
+hot paths.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("query_stats", default=None)
+
+SLOWEST_KEPT = 5
+
+
+class QueryStats:
+    def __init__(self, label: str = "", parent=None):
+        self.label = label
+        self.parent = parent
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = []   # [(ms, statement)], longest first
+
+    def record(self, statement: str, ms: float):
+        self.count += 1
+        self.total_ms += ms
+
+        if len(self.slowest) < SLOWEST_KEPT or ms > self.slowest[-1][0]:
+            self.slowest.append((ms, statement))
+            self.slowest.sort(key=lambda x: x[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+        if self.parent is not None:
+            self.parent.record(statement, ms)
+
+    def summary(self) -> str:
+        line = f"{self.label}: {self.count} queries in {self.total_ms:.1f}ms"
+        if self.slowest:
+            ms, statement = self.slowest[0]
+            line += f", slowest {ms:.1f}ms: {' '.join(statement.split())[:200]}"
+        return line
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(label: str = "", log: bool = True):
+    """
+    Collects every statement run inside the block. Statements in a nested
+    block (or a request made from inside it) count towards both.
+    """
+    stats = QueryStats(label, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if log:
+            logger.info(stats.summary())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = ""):
+    """
+    Fails when the block runs more than max_queries statements:
+
+        with query_budget(10, "dashboard"):
+            client.get("/admin/")
+    """
+    with track_queries(label, log=False) as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        detail = "\n".join(f"  {ms:.1f}ms {' '.join(s.split())[:200]}" for ms, s in stats.slowest)
+        raise QueryBudgetExceeded(
+            f"{label or 'block'} ran {stats.count} queries, budget is {max_queries}.\nSlowest:\n{detail}"
+        )
+
+
+def init_query_stats(app, engine):
+    """
+    Hooks the engine and wraps every request in track_queries().
+    """
+    instrument_engine(engine)
+
+    @app.before_request
+    def _start_request_stats():
+        stats = QueryStats(f"{request.method} {request.path}", parent=_current.get())
+        g._query_stats = stats
+        g._query_stats_token = _current.set(stats)
+
+    @app.after_request
+    def _finish_request_stats(response):
+        stats = g.get("_query_stats")
+        if stats is None:
+            return response
+
+        if app.config.get("QUERY_STATS_HEADERS"):
+            response.headers["X-Query-Count"] = str(stats.count)
+            response.headers["X-Query-Time-Ms"] = f"{stats.total_ms:.1f}"
+
+        if stats.total_ms >= app.config.get("QUERY_STATS_SLOW_MS", 500):
+            logger.warning(stats.summary())
+        else:
+            logger.info(stats.summary())
+        return response
+
+    @app.teardown_request
+    def _reset_request_stats(exc):
+        token = g.pop("_query_stats_token", None)
+        if token is not None:
+            _current.reset(token)
@@ -1,22 +1,58 @@
 import json
 from datetime import date, timedelta
 from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from flask_login import login_required
-from sqlalchemy import func
+import os
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, abort, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy.orm import contains_eager
 
 from app.extensions import db
-from app.models import User, Chore, Assignment, Debt, Absence, ReminderLog, ChoreUserExclusion
-from app.services.fairness import (
-    get_or_create_debt,
-    user_is_away_more_than_week_on_date,
-    pick_assignee_for_chore
-)
+from app.models import User, Chore, Assignment, Absence, ReminderLog, ChoreUserExclusion, Household
+from app.profiling import profile_dir, list_profiles, top_functions
+from app.services.calendar_feed import feed_path as calendar_feed_path
+from app.services.assignment_status import MAX_BATCH, apply_status_changes
+from app.services.dashboard import dashboard_data
+from app.services.debts import load_debt_matrix
+from app.services.history import STATUSES, assignment_history, reminder_log_history
+from app.services.households import get_default_household
+from app.services.rule_index import invalidate_rule_index
 
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
 
+def current_household_id() -> int:
+    """
+    The household the admin is working on (picked on /admin/households),
+    the default one until they pick another.
+    """
+    household_id = session.get("household_id")
+    if household_id is None:
+        household_id = get_default_household().id
+        session["household_id"] = household_id
+    return household_id
+
+
+def get_scoped_or_404(model, object_id):
+    obj = db.get_or_404(model, object_id)
+    household_id = obj.household_id if hasattr(obj, "household_id") else obj.user.household_id
+    if household_id != current_household_id():
+        abort(404)
+    return obj
+
+
+@admin_bp.app_template_global()
+def feed_path(kind: str, object_id: int) -> str:
+    return calendar_feed_path(kind, object_id)
+
+
+@admin_bp.app_context_processor
+def inject_current_household():
+    if not current_user.is_authenticated:
+        return {}
+    return {"current_household": db.session.get(Household, current_household_id())}
+
+
 # @admin_bp.get("/")
 # @login_required
 # def dashboard():
@@ -35,94 +71,51 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 @admin_bp.get("/")
 @login_required
 def dashboard():
-    today = date.today()
-    week_start = today - timedelta(days=today.weekday())
+    return render_template("admin/dashboard.html", **dashboard_data(date.today(), current_household_id()))
 
-    assignments = (
-        Assignment.query
-        .filter(Assignment.week_start_date == week_start)
-        .order_by(Assignment.due_date.asc())
-        .all()
-    )
 
-    # Week counts
-    pending_count = sum(1 for a in assignments if a.status == "pending")
-    done_count = sum(1 for a in assignments if a.status == "done")
-    missed_count = sum(1 for a in assignments if a.status == "missed")
-    reassigned_count = sum(1 for a in assignments if a.status == "reassigned")
+# ---------------- HOUSEHOLDS ----------------
 
-    # Reminders sent this week
-    reminders_sent = (
-        ReminderLog.query
-        .join(Assignment, ReminderLog.assignment_id == Assignment.id)
-        .filter(Assignment.week_start_date == week_start)
-        .count()
-    )
+@admin_bp.get("/households")
+@login_required
+def households():
+    households = Household.query.order_by(Household.name.asc()).all()
+    return render_template("admin/households.html", households=households)
 
-    # Debt leaderboard
-    users = User.query.filter_by(is_active=True).all()
-    chores = Chore.query.all()
-
-    debt_rows = []
-    for u in users:
-        row = {"user": u.name, "total": 0, "per_chore": {}}
-        for c in chores:
-            d = Debt.query.filter_by(user_id=u.id, chore_id=c.id).first()
-            count = d.debt_count if d else 0
-            row["per_chore"][c.name] = count
-            row["total"] += count
-        debt_rows.append(row)
-
-    debt_rows.sort(key=lambda x: x["total"], reverse=True)
-
-    # Monthly stats (simple)
-    month_start = date(today.year, today.month, 1)
-
-    completed_this_month = (
-        db.session.query(User.name, func.count(Assignment.id))
-        .join(Assignment, Assignment.user_id == User.id)
-        .filter(Assignment.status == "done")
-        .filter(Assignment.due_date >= month_start)
-        .group_by(User.name)
-        .all()
-    )
 
-    missed_this_month = (
-        db.session.query(User.name, func.count(Assignment.id))
-        .join(Assignment, Assignment.user_id == User.id)
-        .filter(Assignment.status == "missed")
-        .filter(Assignment.due_date >= month_start)
-        .group_by(User.name)
-        .all()
-    )
+@admin_bp.post("/households/create")
+@login_required
+def households_create():
+    name = request.form["name"].strip()
+    group_chat_name = request.form.get("group_chat_name", "").strip() or None
 
-    completed_map = {name: count for name, count in completed_this_month}
-    missed_map = {name: count for name, count in missed_this_month}
+    household = Household(name=name, group_chat_name=group_chat_name)
+    db.session.add(household)
+    db.session.commit()
 
-    monthly_rows = []
-    for u in users:
-        monthly_rows.append({
-            "user": u.name,
-            "done": completed_map.get(u.name, 0),
-            "missed": missed_map.get(u.name, 0),
-        })
+    flash("Household created.")
+    return redirect(url_for("admin.households"))
 
-    monthly_rows.sort(key=lambda x: x["done"], reverse=True)
 
-    return render_template(
-        "admin/dashboard.html",
-        week_start=week_start,
-        assignments=assignments,
-        pending_count=pending_count,
-        done_count=done_count,
-        missed_count=missed_count,
-        reassigned_count=reassigned_count,
-        reminders_sent=reminders_sent,
-        debt_rows=debt_rows,
-        chores=chores,
-        monthly_rows=monthly_rows,
-        month_start=month_start
-    )
+@admin_bp.post("/households/<int:household_id>/select")
+@login_required
+def households_select(household_id):
+    household = db.get_or_404(Household, household_id)
+    session["household_id"] = household.id
+    flash(f"Now managing {household.name}.")
+    return redirect(url_for("admin.dashboard"))
+
+
+@admin_bp.post("/households/<int:household_id>/update")
+@login_required
+def households_update(household_id):
+    household = db.get_or_404(Household, household_id)
+    household.name = request.form["name"].strip()
+    household.group_chat_name = request.form.get("group_chat_name", "").strip() or None
+    household.is_active = request.form.get("is_active") == "on"
+    db.session.commit()
+    flash("Household updated.")
+    return redirect(url_for("admin.households"))
 
 
 # ---------------- USERS ----------------
@@ -130,7 +123,12 @@ def dashboard():
 @admin_bp.get("/users")
 @login_required
 def users():
-    users = User.query.order_by(User.created_at.desc()).all()
+    users = (
+        User.query
+        .filter_by(household_id=current_household_id())
+        .order_by(User.created_at.desc())
+        .all()
+    )
     return render_template("admin/users.html", users=users)
 
 
@@ -144,7 +142,7 @@ def users_create():
         flash("Phone must be E.164 format, like +1647...")
         return redirect(url_for("admin.users"))
 
-    user = User(name=name, phone_e164=phone)
+    user = User(household_id=current_household_id(), name=name, phone_e164=phone)
     db.session.add(user)
 
     try:
@@ -162,7 +160,7 @@ def users_create():
 @admin_bp.post("/users/<int:user_id>/toggle")
 @login_required
 def users_toggle(user_id):
-    user = User.query.get_or_404(user_id)
+    user = get_scoped_or_404(User, user_id)
     user.is_active = not user.is_active
     db.session.commit()
     return redirect(url_for("admin.users"))
@@ -173,7 +171,12 @@ def users_toggle(user_id):
 @admin_bp.get("/chores")
 @login_required
 def chores():
-    chores = Chore.query.order_by(Chore.created_at.desc()).all()
+    chores = (
+        Chore.query
+        .filter_by(household_id=current_household_id())
+        .order_by(Chore.created_at.desc())
+        .all()
+    )
     return render_template("admin/chores.html", chores=chores)
 
 
@@ -196,6 +199,7 @@ def chores_create():
         return redirect(url_for("admin.chores"))
 
     chore = Chore(
+        household_id=current_household_id(),
         name=name,
         frequency_type=frequency_type,
         day_of_week=day_of_week,
@@ -210,6 +214,7 @@ def chores_create():
         flash("Chore name already exists.")
         return redirect(url_for("admin.chores"))
 
+    invalidate_rule_index()
     flash("Chore created.")
     return redirect(url_for("admin.chores"))
 
@@ -222,15 +227,18 @@ def assignments():
     today = date.today()
     week_start = today - timedelta(days=today.weekday())
 
+    household_id = current_household_id()
+
     assignments = (
         Assignment.query
+        .filter(Assignment.household_id == household_id)
         .filter(Assignment.week_start_date == week_start)
         .order_by(Assignment.due_date.asc())
         .all()
     )
 
-    users = User.query.filter_by(is_active=True).all()
-    chores = Chore.query.all()
+    users = User.query.filter_by(household_id=household_id, is_active=True).all()
+    chores = Chore.query.filter_by(household_id=household_id).all()
 
     return render_template(
         "admin/assignments.html",
@@ -241,19 +249,57 @@ def assignments():
     )
 
 
+def _history_view(load_page, template: str):
+    household_id = current_household_id()
+    filters = {
+        "user_id": request.args.get("user_id", type=int),
+        "chore_id": request.args.get("chore_id", type=int),
+        "status": request.args.get("status") if request.args.get("status") in STATUSES else None,
+    }
+
+    try:
+        page = load_page(
+            household_id, **filters,
+            older=request.args.get("older") or None,
+            newer=request.args.get("newer") or None,
+        )
+    except ValueError:
+        abort(400)
+
+    users = User.query.filter_by(household_id=household_id).order_by(User.name.asc()).all()
+    chores = Chore.query.filter_by(household_id=household_id).order_by(Chore.name.asc()).all()
+
+    return render_template(
+        template,
+        page=page,
+        filters=filters,
+        filter_args={k: v for k, v in filters.items() if v},
+        users=users,
+        chores=chores,
+        statuses=STATUSES,
+    )
+
+
+@admin_bp.get("/assignments/history")
+@login_required
+def assignments_history():
+    return _history_view(assignment_history, "admin/assignment_history.html")
+
+
 @admin_bp.get("/assignments/new")
 @login_required
 def assignment_new():
-    users = User.query.filter_by(is_active=True).order_by(User.name.asc()).all()
-    chores = Chore.query.order_by(Chore.name.asc()).all()
+    household_id = current_household_id()
+    users = User.query.filter_by(household_id=household_id, is_active=True).order_by(User.name.asc()).all()
+    chores = Chore.query.filter_by(household_id=household_id).order_by(Chore.name.asc()).all()
     return render_template("admin/assignment_new.html", users=users, chores=chores)
 
 
 @admin_bp.post("/assignments/create")
 @login_required
 def assignment_create():
-    chore_id = int(request.form["chore_id"])
-    user_id = int(request.form["user_id"])
+    chore = get_scoped_or_404(Chore, int(request.form["chore_id"]))
+    user = get_scoped_or_404(User, int(request.form["user_id"]))
     due_date_str = request.form["due_date"]
     status = request.form["status"]
 
@@ -263,8 +309,9 @@ def assignment_create():
     week_start_date = due_date - timedelta(days=due_date.weekday())
 
     a = Assignment(
-        chore_id=chore_id,
-        user_id=user_id,
+        household_id=chore.household_id,
+        chore_id=chore.id,
+        user_id=user.id,
         due_date=due_date,
         week_start_date=week_start_date,
         status=status,
@@ -283,89 +330,64 @@ def assignment_create():
 @admin_bp.post("/assignments/<int:assignment_id>/done")
 @login_required
 def assignment_done(assignment_id):
-    a = Assignment.query.get_or_404(assignment_id)
-
-    if a.status != "done":
-        a.status = "done"
-        a.completed_at = datetime.now()
-
-        # Reduce debt if any
-        debt = get_or_create_debt(a.user_id, a.chore_id)
-        if debt.debt_count > 0:
-            debt.debt_count -= 1
-
-        db.session.commit()
-
+    a = get_scoped_or_404(Assignment, assignment_id)
+    apply_status_changes([(a.id, "done")], a.household_id)
     return redirect(url_for("admin.assignments"))
 
 
 @admin_bp.post("/assignments/<int:assignment_id>/missed")
 @login_required
 def assignment_missed(assignment_id):
-    a = Assignment.query.get_or_404(assignment_id)
-
-    if a.status != "missed":
-        a.status = "missed"
-        a.completed_at = None
-
-        # Debt increases ONLY if not away > 1 week
-        if not user_is_away_more_than_week_on_date(a.user_id, a.due_date):
-            debt = get_or_create_debt(a.user_id, a.chore_id)
-            debt.debt_count += 1
-
-        db.session.commit()
-
+    a = get_scoped_or_404(Assignment, assignment_id)
+    apply_status_changes([(a.id, "missed")], a.household_id)
     return redirect(url_for("admin.assignments"))
 
 
 @admin_bp.post("/assignments/<int:assignment_id>/reassign")
 @login_required
 def assignment_reassign(assignment_id):
-    a = Assignment.query.get_or_404(assignment_id)
-
-    # Track history
-    prev_ids = set(json.loads(a.previous_user_ids_json or "[]"))
-    prev_ids.add(a.user_id)  # current user becomes part of history
+    a = get_scoped_or_404(Assignment, assignment_id)
+    result = apply_status_changes([(a.id, "reassign")], a.household_id)[0]
 
-    # Who already has a chore this week
-    week_assignments = Assignment.query.filter_by(week_start_date=a.week_start_date).all()
-    already_assigned = {x.user_id for x in week_assignments}
+    if not result["ok"]:
+        flash(result["error"])
+    else:
+        flash(f"Reassigned to {result['user']}.")
+    return redirect(url_for("admin.assignments"))
 
-    # --- Phase 1: avoid duplicates + avoid history ---
-    exclude_ids = already_assigned.union(prev_ids)
 
-    new_user = pick_assignee_for_chore(
-        a.chore_id,
-        a.due_date,
-        exclude_user_ids=exclude_ids
+@admin_bp.post("/assignments/bulk-status")
+@login_required
+def assignments_bulk_status():
+    """
+    JSON: {"items": [{"assignment_id": 12, "action": "done"}, ...]}
+    action is done, missed or reassign. Applied in order, in one transaction;
+    the response has one result per item.
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return jsonify({"ok": False, "error": 'Expected {"items": [{"assignment_id": ..., "action": ...}]}'}), 400
+    if len(items) > MAX_BATCH:
+        return jsonify({"ok": False, "error": f"At most {MAX_BATCH} items per request."}), 400
+
+    results = apply_status_changes(
+        [(item.get("assignment_id"), item.get("action")) for item in items],
+        current_household_id(),
     )
-
-    # --- Phase 2 fallback: allow duplicates, but still avoid history ---
-    if not new_user:
-        new_user = pick_assignee_for_chore(
-            a.chore_id,
-            a.due_date,
-            exclude_user_ids=prev_ids
-        )
-
-    if not new_user:
-        flash("No eligible user found to reassign (everyone already tried).")
-        return redirect(url_for("admin.assignments"))
-
-    # Save new assignment
-    a.previous_user_ids_json = json.dumps(sorted(list(prev_ids)))
-    a.user_id = new_user.id
-    a.status = "reassigned"
-    db.session.commit()
-
-    flash(f"Reassigned to {new_user.name}.")
-    return redirect(url_for("admin.assignments"))
+    applied = sum(1 for r in results if r["ok"])
+    return jsonify({
+        "ok": applied == len(results),
+        "applied": applied,
+        "failed": len(results) - applied,
+        "results": results,
+    })
 
 
 @admin_bp.post("/assignments/<int:assignment_id>/delete")
 @login_required
 def assignment_delete(assignment_id):
-    a = Assignment.query.get_or_404(assignment_id)
+    a = get_scoped_or_404(Assignment, assignment_id)
 
     # delete reminder logs tied to this assignment
     ReminderLog.query.filter_by(assignment_id=a.id).delete()
@@ -382,19 +404,12 @@ def assignment_delete(assignment_id):
 @admin_bp.get("/debts")
 @login_required
 def debts():
-    users = User.query.order_by(User.name.asc()).all()
-    chores = Chore.query.order_by(Chore.name.asc()).all()
-
-    # Build matrix for display
-    debt_map = {}
-    for u in users:
-        for c in chores:
-            debt = Debt.query.filter_by(user_id=u.id, chore_id=c.id).first()
-            if not debt:
-                debt = Debt(user_id=u.id, chore_id=c.id, debt_count=0)
-                db.session.add(debt)
-                db.session.commit()
-            debt_map[(u.id, c.id)] = debt.debt_count
+    household_id = current_household_id()
+    users = User.query.filter_by(household_id=household_id).order_by(User.name.asc()).all()
+    chores = Chore.query.filter_by(household_id=household_id).order_by(Chore.name.asc()).all()
+
+    # Build matrix for display (missing cells show as 0, nothing is written)
+    debt_map = load_debt_matrix([u.id for u in users], [c.id for c in chores])
 
     return render_template(
         "admin/debts.html",
@@ -409,12 +424,16 @@ def debts():
 @admin_bp.get("/absences")
 @login_required
 def absences():
+    household_id = current_household_id()
+
     absences = (
         Absence.query
+        .join(User, Absence.user_id == User.id)
+        .filter(User.household_id == household_id)
         .order_by(Absence.start_date.desc())
         .all()
     )
-    users = User.query.filter_by(is_active=True).order_by(User.name.asc()).all()
+    users = User.query.filter_by(household_id=household_id, is_active=True).order_by(User.name.asc()).all()
 
     return render_template(
         "admin/absences.html",
@@ -426,7 +445,7 @@ def absences():
 @admin_bp.post("/absences/create")
 @login_required
 def absences_create():
-    user_id = int(request.form["user_id"])
+    user_id = get_scoped_or_404(User, int(request.form["user_id"])).id
     start_date = request.form["start_date"]
     end_date = request.form["end_date"]
     reason = request.form.get("reason", "").strip() or None
@@ -447,7 +466,7 @@ def absences_create():
 @admin_bp.post("/absences/<int:absence_id>/delete")
 @login_required
 def absences_delete(absence_id):
-    a = Absence.query.get_or_404(absence_id)
+    a = get_scoped_or_404(Absence, absence_id)
     db.session.delete(a)
     db.session.commit()
     flash("Absence deleted.")
@@ -465,7 +484,13 @@ def reminder_logs():
     logs = (
         ReminderLog.query
         .join(Assignment, ReminderLog.assignment_id == Assignment.id)
+        .options(
+            contains_eager(ReminderLog.assignment).joinedload(Assignment.chore),
+            contains_eager(ReminderLog.assignment).joinedload(Assignment.user),
+        )
+        .filter(Assignment.household_id == current_household_id())
         .filter(Assignment.week_start_date == week_start)
+        .filter(ReminderLog.status == "sent")
         .order_by(ReminderLog.sent_at.desc())
         .all()
     )
@@ -476,19 +501,30 @@ def reminder_logs():
         week_start=week_start
     )
 
+
+@admin_bp.get("/reminder-logs/history")
+@login_required
+def reminder_logs_history():
+    return _history_view(reminder_log_history, "admin/reminder_log_history.html")
+
+
 # ---------------- CHORE EXCLUSIONS ----------------
 
 @admin_bp.get("/chore-exclusions")
 @login_required
 def chore_exclusions():
+    household_id = current_household_id()
+
     exclusions = (
         ChoreUserExclusion.query
+        .join(User, ChoreUserExclusion.user_id == User.id)
+        .filter(User.household_id == household_id)
         .order_by(ChoreUserExclusion.id.desc())
         .all()
     )
 
-    users = User.query.filter_by(is_active=True).order_by(User.name.asc()).all()
-    chores = Chore.query.order_by(Chore.name.asc()).all()
+    users = User.query.filter_by(household_id=household_id, is_active=True).order_by(User.name.asc()).all()
+    chores = Chore.query.filter_by(household_id=household_id).order_by(Chore.name.asc()).all()
 
     return render_template(
         "admin/chore_exclusions.html",
@@ -501,8 +537,8 @@ def chore_exclusions():
 @admin_bp.post("/chore-exclusions/create")
 @login_required
 def chore_exclusions_create():
-    chore_id = int(request.form["chore_id"])
-    user_id = int(request.form["user_id"])
+    chore_id = get_scoped_or_404(Chore, int(request.form["chore_id"])).id
+    user_id = get_scoped_or_404(User, int(request.form["user_id"])).id
 
     existing = ChoreUserExclusion.query.filter_by(chore_id=chore_id, user_id=user_id).first()
     if existing:
@@ -519,7 +555,7 @@ def chore_exclusions_create():
 @admin_bp.post("/chore-exclusions/<int:exclusion_id>/delete")
 @login_required
 def chore_exclusions_delete(exclusion_id):
-    e = ChoreUserExclusion.query.get_or_404(exclusion_id)
+    e = get_scoped_or_404(ChoreUserExclusion, exclusion_id)
     db.session.delete(e)
     db.session.commit()
     flash("Exclusion removed.")
@@ -529,14 +565,14 @@ def chore_exclusions_delete(exclusion_id):
 @admin_bp.get("/chores/<int:chore_id>/edit")
 @login_required
 def chore_edit(chore_id):
-    c = Chore.query.get_or_404(chore_id)
+    c = get_scoped_or_404(Chore, chore_id)
     return render_template("admin/chore_edit.html", chore=c)
 
 
 @admin_bp.post("/chores/<int:chore_id>/update")
 @login_required
 def chore_update(chore_id):
-    c = Chore.query.get_or_404(chore_id)
+    c = get_scoped_or_404(Chore, chore_id)
 
     c.name = request.form["name"].strip()
     c.frequency = request.form["frequency_type"]
@@ -546,5 +582,38 @@ def chore_update(chore_id):
     c.reminder_rules_json = reminder_rules_raw  # keep raw json string
 
     db.session.commit()
+    invalidate_rule_index()
     flash("Chore updated.")
     return redirect(url_for("admin.chores"))
+
+
+# ---------------- PROFILES ----------------
+
+@admin_bp.get("/profiles")
+@login_required
+def profiles():
+    directory = profile_dir(current_app)
+    recent = list_profiles(directory)
+
+    # top functions for the newest few, the rest are one click away
+    for p in recent[:5]:
+        p["top"] = top_functions(os.path.join(directory, p["name"]), limit=5)["functions"]
+
+    return render_template(
+        "admin/profiles.html",
+        profiles=recent,
+        enabled=current_app.config["PROFILING_ENABLED"],
+        directory=directory
+    )
+
+
+@admin_bp.get("/profiles/<name>")
+@login_required
+def profile_detail(name):
+    directory = profile_dir(current_app)
+    if name not in {p["name"] for p in list_profiles(directory, limit=None)}:
+        abort(404)
+
+    sort = "tottime" if request.args.get("sort") == "tottime" else "cumulative"
+    summary = top_functions(os.path.join(directory, name), limit=40, sort=sort)
+    return render_template("admin/profile_detail.html", name=name, sort=sort, **summary)
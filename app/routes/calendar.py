@@ -0,0 +1,76 @@
+from datetime import date, timezone
+from flask import Blueprint, Response, request, abort
+
+from app.config import Config
+from app.extensions import db
+from app.models import User, Household
+from app.services.calendar_feed import (
+    token_is_valid,
+    window_start,
+    last_modified,
+    render_user_feed,
+    render_household_feed,
+)
+
+
+calendar_bp = Blueprint("calendar", __name__, url_prefix="/calendar")
+
+
+def feed_response(kind: str, object_id: int, row, render) -> Response:
+    """
+    row: (name, feed_version, feed_updated_at, created_at) of the owner.
+    Answers 304 from those alone when the client's copy is current.
+    """
+    name, version, updated_at, created_at = row
+    start = window_start(date.today())
+    etag = f"{kind}-{object_id}-v{version}-{start:%Y%m%d}"
+    modified = last_modified(updated_at, created_at, start).astimezone(timezone.utc)
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and modified <= since
+
+    if not_modified:
+        response = Response(status=304)
+    else:
+        body = render(object_id, name, version, start, modified)
+        response = Response(body, mimetype="text/calendar")
+        response.headers["Content-Disposition"] = f'inline; filename="{kind}-{object_id}.ics"'
+
+    response.set_etag(etag)
+    response.last_modified = modified
+    response.cache_control.private = True
+    response.cache_control.max_age = Config.ICS_MAX_AGE_SECONDS
+    return response
+
+
+@calendar_bp.get("/user/<int:user_id>/<token>.ics")
+def user_feed(user_id, token):
+    if not token_is_valid("user", user_id, token):
+        abort(404)
+
+    row = (
+        db.session.query(User.name, User.feed_version, User.feed_updated_at, User.created_at)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        abort(404)
+    return feed_response("user", user_id, row, render_user_feed)
+
+
+@calendar_bp.get("/household/<int:household_id>/<token>.ics")
+def household_feed(household_id, token):
+    if not token_is_valid("household", household_id, token):
+        abort(404)
+
+    row = (
+        db.session.query(Household.name, Household.feed_version, Household.feed_updated_at, Household.created_at)
+        .filter(Household.id == household_id)
+        .first()
+    )
+    if row is None:
+        abort(404)
+    return feed_response("household", household_id, row, render_household_feed)
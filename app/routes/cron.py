@@ -1,9 +1,11 @@
-from flask import Blueprint, request, abort, jsonify
+from flask import Blueprint, Response, request, abort, jsonify, g
 from datetime import date, datetime
+import time
 
 from app.config import Config
-from app.services.scheduler import generate_weekly_assignments
-from app.services.reminders import send_due_reminders
+from app.metrics import CRON_DURATION, registry
+from app.services.fanout import run_for_households
+from app.services.households import active_household_ids
 
 
 cron_bp = Blueprint("cron", __name__, url_prefix="/cron")
@@ -15,34 +17,102 @@ def require_cron_secret():
         abort(401)
 
 
+@cron_bp.before_request
+def start_timer():
+    g.cron_started = time.perf_counter()
+
+
+@cron_bp.after_request
+def record_duration(response):
+    started = g.pop("cron_started", None)
+    if started is not None and request.endpoint != "cron.metrics":
+        CRON_DURATION.observe(time.perf_counter() - started, endpoint=request.endpoint or "unknown")
+    return response
+
+
+def target_household_ids():
+    """
+    ?household_id=N limits a run to one household, otherwise all active ones.
+    """
+    household_id = request.args.get("household_id", type=int)
+    if household_id is not None:
+        return [household_id]
+    return active_household_ids()
+
+
+def summarize(results: list, count_key: str) -> dict:
+    return {
+        count_key: sum(r.get(count_key, 0) for r in results if r["ok"]),
+        "failed_households": [r["household_id"] for r in results if not r["ok"]],
+        "households": results,
+    }
+
+
 @cron_bp.post("/ping")
 def ping():
     require_cron_secret()
     return jsonify({"ok": True})
 
 
+@cron_bp.get("/metrics")
+def metrics():
+    """
+    Prometheus text format. Takes the cron secret either as X-CRON-SECRET
+    or as a bearer token (what Prometheus' `authorization` config sends).
+    """
+    auth = request.headers.get("Authorization", "")
+    if not (auth.startswith("Bearer ") and auth[len("Bearer "):] == Config.CRON_SECRET):
+        require_cron_secret()
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
 @cron_bp.post("/generate-weekly-assignments")
 def cron_generate_weekly_assignments():
     require_cron_secret()
-    created = generate_weekly_assignments(today=date.today())
-    return jsonify({
-        "created_count": len(created),
-        "created": [
-            {"id": a.id, "chore": a.chore.name, "user": a.user.name, "due": str(a.due_date)}
-            for a in created
-        ]
-    })
+    results = run_for_households(
+        "generate_weekly",
+        target_household_ids(),
+        today=date.today(),
+        mode=request.args.get("mode"),
+    )
+    body = summarize(results, "created_count")
+    body["created"] = [c for r in results if r["ok"] for c in r["created"]]
+    return jsonify(body)
+
+
+@cron_bp.post("/generate-assignments-horizon")
+def cron_generate_assignments_horizon():
+    require_cron_secret()
+    weeks = request.args.get("weeks", Config.PLANNING_HORIZON_WEEKS, type=int)
+    weeks = max(1, min(weeks, Config.PLANNING_HORIZON_MAX_WEEKS))
+
+    results = run_for_households(
+        "horizon",
+        target_household_ids(),
+        today=date.today(),
+        weeks=weeks,
+        mode=request.args.get("mode"),
+    )
+    body = summarize(results, "created_count")
+    body["weeks"] = weeks
+    body["created"] = [c for r in results if r["ok"] for c in r["created"]]
+    return jsonify(body)
+
 
 @cron_bp.post("/send-reminders")
 def cron_send_reminders():
     require_cron_secret()
     # sent = send_due_reminders(now=datetime.now())
-    sent = send_due_reminders(now=datetime.now())
-    return jsonify({"sent_count": sent})
+    results = run_for_households("send_reminders", target_household_ids(), now=datetime.now())
+    body = summarize(results, "sent_count")
+    body["mode"] = Config.REMINDER_DISPATCH_MODE
+    return jsonify(body)
 
 
 @cron_bp.post("/send-reminders-force")
 def cron_send_reminders_force():
     require_cron_secret()
-    sent = send_due_reminders(now=datetime.now(), force=True)
-    return jsonify({"sent_count": sent, "forced": True})
+    results = run_for_households("send_reminders", target_household_ids(), now=datetime.now(), force=True)
+    body = summarize(results, "sent_count")
+    body["forced"] = True
+    return jsonify(body)
@@ -0,0 +1,85 @@
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from app.extensions import db
+from app.models import Absence
+
+AWAY_MIN_DAYS = 7
+
+
+def merge_intervals(intervals):
+    """
+    Sorts (start, end) date pairs and merges the ones that overlap.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+            continue
+        merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def is_long_absence(start: date, end: date) -> bool:
+    return (end - start).days + 1 >= AWAY_MIN_DAYS
+
+
+class AbsenceIndex:
+    """
+    Absences of at least AWAY_MIN_DAYS, keyed by user, stored as sorted,
+    merged intervals.
+
+    Answers "away >= 7 days on date D" with a bisect instead of scanning
+    every Absence row. Each absence must be long enough on its own: shorter
+    ones are left out before merging, so two short absences never add up
+    to a long one.
+    """
+
+    def __init__(self, intervals_by_user):
+        self.intervals_by_user = {}
+        self.starts_by_user = {}
+        for user_id, intervals in intervals_by_user.items():
+            merged = merge_intervals(
+                (start, end) for start, end in intervals if is_long_absence(start, end)
+            )
+            self.intervals_by_user[user_id] = merged
+            self.starts_by_user[user_id] = [start for start, _ in merged]
+
+    @classmethod
+    def load(cls, user_ids=None):
+        q = db.session.query(Absence.user_id, Absence.start_date, Absence.end_date)
+        if user_ids is not None:
+            q = q.filter(Absence.user_id.in_(list(user_ids)))
+
+        intervals_by_user = defaultdict(list)
+        for user_id, start, end in q.all():
+            intervals_by_user[user_id].append((start, end))
+        return cls(intervals_by_user)
+
+    def interval_on(self, user_id: int, check_date: date):
+        starts = self.starts_by_user.get(user_id)
+        if not starts:
+            return None
+
+        i = bisect_right(starts, check_date) - 1
+        if i < 0:
+            return None
+
+        start, end = self.intervals_by_user[user_id][i]
+        if check_date <= end:
+            return start, end
+        return None
+
+    def is_away_more_than_week(self, user_id: int, check_date: date) -> bool:
+        return self.interval_on(user_id, check_date) is not None
+
+    def away_more_than_week_many(self, pairs) -> dict:
+        """
+        pairs: iterable of (user_id, date)
+        Returns {(user_id, date): bool}
+        """
+        return {
+            (user_id, check_date): self.is_away_more_than_week(user_id, check_date)
+            for user_id, check_date in pairs
+        }
@@ -0,0 +1,185 @@
+"""
+Marking assignments done / missed / reassigned, one or many at a time.
+
+A batch is applied in one transaction: the assignments are loaded in one
+query, absences for every "missed" item come from one batch lookup, the
+fairness snapshot for reassignments is loaded once, and all debt changes
+are written with one batched upsert at the end.
+"""
+import json
+from datetime import datetime
+from app.extensions import db
+from app.models import Assignment
+from app.services.debts import apply_debt_deltas, load_debt_matrix
+from app.services.fairness import FairnessSnapshot, users_away_more_than_week_on_dates
+
+ACTIONS = {"done", "missed", "reassign"}
+
+# largest batch the JSON endpoint accepts
+MAX_BATCH = 500
+
+
+class _Batch:
+    def __init__(self, assignments: dict, household_id: int):
+        self.assignments = assignments
+        self.household_id = household_id
+
+        involved = list(assignments.values())
+        self.debts = load_debt_matrix({a.user_id for a in involved}, {a.chore_id for a in involved})
+        self.deltas = {}
+
+        self.away = {}
+        self.snapshot = None
+        self.week_users = None
+
+    def change_debt(self, user_id: int, chore_id: int, delta: int):
+        pair = (user_id, chore_id)
+        if pair not in self.debts:
+            # a user brought in by a reassignment earlier in the batch
+            self.debts[pair] = self.load_snapshot().debt_for(user_id, chore_id)
+        current = self.debts[pair]
+        delta = max(delta, -current)   # never below 0
+        if not delta:
+            return
+
+        self.debts[pair] = current + delta
+        self.deltas[pair] = self.deltas.get(pair, 0) + delta
+        if self.snapshot is not None:
+            self.snapshot.debts[pair] = self.debts[pair]
+
+    def is_away(self, user_id: int, due_date) -> bool:
+        key = (user_id, due_date)
+        if key not in self.away:
+            # only happens when a reassignment earlier in the batch changed the user
+            self.away[key] = self.load_snapshot().is_away_more_than_week(user_id, due_date)
+        return self.away[key]
+
+    def load_snapshot(self) -> FairnessSnapshot:
+        if self.snapshot is None:
+            self.snapshot = FairnessSnapshot.load(self.household_id)
+            for pair, count in self.debts.items():
+                self.snapshot.debts[pair] = count
+        return self.snapshot
+
+    def users_in_week(self, week_start) -> set:
+        if self.week_users is None:
+            weeks = {a.week_start_date for a in self.assignments.values()}
+            self.week_users = {}
+            for user_id, week in (
+                db.session.query(Assignment.user_id, Assignment.week_start_date)
+                .filter(Assignment.household_id == self.household_id)
+                .filter(Assignment.week_start_date.in_(weeks))
+                .all()
+            ):
+                self.week_users.setdefault(week, set()).add(user_id)
+        return self.week_users.setdefault(week_start, set())
+
+
+def _mark_done(batch: _Batch, a: Assignment) -> dict:
+    if a.status == "done":
+        return {"changed": False}
+
+    a.status = "done"
+    a.completed_at = datetime.now()
+    # Reduce debt if any
+    batch.change_debt(a.user_id, a.chore_id, -1)
+    return {"changed": True}
+
+
+def _mark_missed(batch: _Batch, a: Assignment) -> dict:
+    if a.status == "missed":
+        return {"changed": False}
+
+    a.status = "missed"
+    a.completed_at = None
+    # Debt increases ONLY if not away > 1 week
+    if not batch.is_away(a.user_id, a.due_date):
+        batch.change_debt(a.user_id, a.chore_id, 1)
+    return {"changed": True}
+
+
+def _reassign(batch: _Batch, a: Assignment) -> dict:
+    snapshot = batch.load_snapshot()
+
+    # current user becomes part of history
+    prev_ids = set(json.loads(a.previous_user_ids_json or "[]"))
+    prev_ids.add(a.user_id)
+
+    # Phase 1: avoid users who already have a chore this week + history,
+    # Phase 2 fallback: allow duplicates, but still avoid history
+    already_assigned = batch.users_in_week(a.week_start_date)
+    new_user = (
+        snapshot.pick(a.chore_id, a.due_date, exclude_user_ids=already_assigned | prev_ids)
+        or snapshot.pick(a.chore_id, a.due_date, exclude_user_ids=prev_ids)
+    )
+    if not new_user:
+        return {"error": "No eligible user found to reassign (everyone already tried)."}
+
+    a.previous_user_ids_json = json.dumps(sorted(prev_ids))
+    a.user_id = new_user.id
+    a.status = "reassigned"
+
+    already_assigned.add(new_user.id)
+    snapshot.record_assignment(new_user.id, a.chore_id, a.week_start_date)
+    return {"changed": True, "user_id": new_user.id, "user": new_user.name}
+
+
+HANDLERS = {"done": _mark_done, "missed": _mark_missed, "reassign": _reassign}
+
+
+def _valid(assignment_id, action) -> bool:
+    # items come straight from JSON: bools are ints in Python, lists aren't hashable
+    return type(assignment_id) is int and isinstance(action, str) and action in ACTIONS
+
+
+def apply_status_changes(items, household_id: int) -> list:
+    """
+    items: [(assignment_id, action), ...], applied in order and committed
+    together. Returns one result dict per item, in the same order:
+    {"assignment_id", "action", "ok", "status", "changed"} or
+    {"assignment_id", "action", "ok": False, "error"}.
+    """
+    items = list(items)
+    ids = {assignment_id for assignment_id, action in items if _valid(assignment_id, action)}
+
+    assignments = {
+        a.id: a for a in
+        Assignment.query
+        .filter(Assignment.household_id == household_id, Assignment.id.in_(ids))
+        .all()
+    } if ids else {}
+
+    batch = _Batch(assignments, household_id)
+    batch.away = users_away_more_than_week_on_dates({
+        (assignments[assignment_id].user_id, assignments[assignment_id].due_date)
+        for assignment_id, action in items
+        if _valid(assignment_id, action) and action == "missed" and assignment_id in assignments
+    })
+
+    results = []
+    try:
+        for assignment_id, action in items:
+            result = {"assignment_id": assignment_id, "action": action}
+
+            a = assignments.get(assignment_id) if _valid(assignment_id, action) else None
+            if type(assignment_id) is not int:
+                result.update(ok=False, error="assignment_id must be an integer.")
+            elif not isinstance(action, str) or action not in ACTIONS:
+                result.update(ok=False, error=f"Unknown action, expected one of: {', '.join(sorted(ACTIONS))}.")
+            elif a is None:
+                result.update(ok=False, error="Assignment not found.")
+            else:
+                outcome = HANDLERS[action](batch, a)
+                result["ok"] = "error" not in outcome
+                result.update(outcome)
+                result["status"] = a.status
+
+            results.append(result)
+
+        apply_debt_deltas(batch.deltas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return results
@@ -0,0 +1,40 @@
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db
+
+
+def insert_ignoring_conflicts(model, values: list, index_elements: list) -> int:
+    """
+    Single INSERT ... ON CONFLICT (index_elements) DO NOTHING for a batch of
+    row dicts. Does not commit. Returns how many rows were inserted.
+    """
+    if not values:
+        return 0
+
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        stmt = sqlite.insert(model).values(values).on_conflict_do_nothing(
+            index_elements=index_elements
+        )
+    elif dialect == "postgresql":
+        stmt = postgresql.insert(model).values(values).on_conflict_do_nothing(
+            index_elements=index_elements
+        )
+    else:
+        # no portable upsert: insert only the keys we don't have yet
+        cols = [getattr(model, name) for name in index_elements]
+        keys = {tuple(v[name] for name in index_elements) for v in values}
+        existing = set(
+            db.session.query(*cols).filter(tuple_(*cols).in_(list(keys))).all()
+        )
+        values = [
+            v for v in values
+            if tuple(v[name] for name in index_elements) not in existing
+        ]
+        if not values:
+            return 0
+        stmt = db.insert(model).values(values)
+
+    result = db.session.execute(stmt)
+    return result.rowcount
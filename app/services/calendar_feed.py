@@ -0,0 +1,161 @@
+"""
+ICS calendar feeds: one per user (their assignments) and one per
+household (everyone's), both with the garbage pickup dates.
+
+Feeds are addressed by an HMAC token instead of a login, since calendar
+apps can't sign in. A rendered feed is keyed by its owner's feed_version
+and the window start, so a small LRU cache never serves stale content
+and a poll that changed nothing costs one indexed lookup.
+"""
+import hashlib
+import hmac
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from sqlalchemy.orm import joinedload
+from app.config import Config
+from app.models import Assignment
+from app.services.garbage_cycle import REFERENCE_FRIDAY, garbage_bin_type_for_pickup, garbage_bins_text
+
+PRODID = "-//house-chores-bot//calendar feed//EN"
+UID_DOMAIN = "house-chores-bot"
+
+STATUS_PREFIX = {"done": "✅ ", "missed": "❌ ", "reassigned": "🔁 "}
+
+
+def feed_token(kind: str, object_id: int) -> str:
+    msg = f"{kind}:{object_id}".encode()
+    return hmac.new(Config.SECRET_KEY.encode(), msg, hashlib.sha256).hexdigest()[:32]
+
+
+def token_is_valid(kind: str, object_id: int, token: str) -> bool:
+    return hmac.compare_digest(feed_token(kind, object_id), token)
+
+
+def feed_path(kind: str, object_id: int) -> str:
+    return f"/calendar/{kind}/{object_id}/{feed_token(kind, object_id)}.ics"
+
+
+def window_start(today: date) -> date:
+    """
+    Oldest date in a feed: the start of the week ICS_PAST_WEEKS ago.
+    """
+    return today - timedelta(days=today.weekday(), weeks=Config.ICS_PAST_WEEKS)
+
+
+def pickup_dates(start: date, end: date) -> list:
+    first = REFERENCE_FRIDAY + timedelta(days=(start - REFERENCE_FRIDAY).days // 7 * 7)
+    if first < start:
+        first += timedelta(weeks=1)
+    return [first + timedelta(weeks=i) for i in range((end - first).days // 7 + 1)] if first <= end else []
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """
+    RFC 5545 lines are at most 75 octets; continuations start with a space.
+    """
+    if len(line.encode("utf-8")) <= 75:
+        return line
+
+    parts, current, size = [], "", 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += ch
+        size += n
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event(uid: str, day: date, summary: str, description: str, stamp: str) -> list:
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{UID_DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(description)}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+
+
+def build_calendar(name: str, assignments, start: date, stamp: datetime, show_user: bool) -> str:
+    stamp_text = _stamp(stamp)
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+
+    for a in assignments:
+        summary = STATUS_PREFIX.get(a.status, "") + a.chore.name
+        if show_user:
+            summary += f" ({a.user.name})"
+        lines += _event(
+            f"assignment-{a.id}", a.due_date, summary,
+            f"{a.chore.name} for {a.user.name}, week of {a.week_start_date}. Status: {a.status}.",
+            stamp_text,
+        )
+
+    end = start + timedelta(weeks=Config.ICS_PAST_WEEKS + Config.ICS_FUTURE_WEEKS)
+    for pickup in pickup_dates(start, end):
+        lines += _event(
+            f"pickup-{pickup:%Y%m%d}", pickup,
+            f"🗑️ Garbage pickup ({garbage_bin_type_for_pickup(pickup)} bin)",
+            f"Bins out: {garbage_bins_text(pickup)}",
+            stamp_text,
+        )
+
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def _assignments(start: date, **filters):
+    return (
+        Assignment.query
+        .options(joinedload(Assignment.chore), joinedload(Assignment.user))
+        .filter_by(**filters)
+        .filter(Assignment.due_date >= start)
+        .order_by(Assignment.due_date.asc(), Assignment.id.asc())
+        .all()
+    )
+
+
+# version and start are part of the key so a change never hits an old entry
+@lru_cache(maxsize=Config.ICS_CACHE_SIZE)
+def render_user_feed(user_id: int, name: str, version: int, start: date, stamp: datetime) -> str:
+    return build_calendar(f"Chores: {name}", _assignments(start, user_id=user_id), start, stamp, show_user=False)
+
+
+@lru_cache(maxsize=Config.ICS_CACHE_SIZE)
+def render_household_feed(household_id: int, name: str, version: int, start: date, stamp: datetime) -> str:
+    return build_calendar(
+        f"Chores: {name}", _assignments(start, household_id=household_id), start, stamp, show_user=True
+    )
+
+
+def last_modified(updated_at: datetime | None, created_at: datetime | None, start: date) -> datetime:
+    """
+    The feed changes when its data does and when the window moves on.
+    Whole seconds, as HTTP dates have no fractions.
+    """
+    # the window last moved on at the start of the current week
+    moments = [datetime.combine(start + timedelta(weeks=Config.ICS_PAST_WEEKS), time.min)]
+    moments += [m for m in (updated_at, created_at) if m is not None]
+    return max(moments).replace(microsecond=0)
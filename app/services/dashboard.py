@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.models import User, Chore, Assignment, ReminderLog
+from app.services.debts import load_debt_matrix
+from app.services.households import resolve_household_id
+
+
+def debt_leaderboard(users, chores) -> list:
+    """
+    One debt query, pivoted in memory into per-user rows sorted by total.
+    """
+    debt_map = load_debt_matrix([u.id for u in users], [c.id for c in chores])
+
+    debt_rows = []
+    for u in users:
+        row = {"user": u.name, "total": 0, "per_chore": {}}
+        for c in chores:
+            count = debt_map[(u.id, c.id)]
+            row["per_chore"][c.name] = count
+            row["total"] += count
+        debt_rows.append(row)
+
+    debt_rows.sort(key=lambda x: x["total"], reverse=True)
+    return debt_rows
+
+
+def monthly_stats(users, month_start: date, household_id: int | None = None) -> list:
+    """
+    Done/missed counts per user since month_start, one conditional
+    aggregate keyed by user id (users sharing a name stay separate).
+    """
+    counts = (
+        db.session.query(
+            Assignment.user_id,
+            func.sum(case((Assignment.status == "done", 1), else_=0)),
+            func.sum(case((Assignment.status == "missed", 1), else_=0)),
+        )
+        .filter(Assignment.due_date >= month_start)
+        .filter(Assignment.status.in_(["done", "missed"]))
+        .filter(Assignment.household_id == household_id)
+        .group_by(Assignment.user_id)
+        .all()
+    )
+    count_map = {user_id: (done or 0, missed or 0) for user_id, done, missed in counts}
+
+    monthly_rows = []
+    for u in users:
+        done, missed = count_map.get(u.id, (0, 0))
+        monthly_rows.append({"user": u.name, "done": done, "missed": missed})
+
+    monthly_rows.sort(key=lambda x: x["done"], reverse=True)
+    return monthly_rows
+
+
+def dashboard_data(today: date | None = None, household_id: int | None = None) -> dict:
+    """
+    Everything the admin dashboard renders for one household, in a fixed
+    number of queries regardless of how many users and chores there are.
+    """
+    if not today:
+        today = date.today()
+
+    household_id = resolve_household_id(household_id)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = date(today.year, today.month, 1)
+
+    assignments = (
+        Assignment.query
+        .options(joinedload(Assignment.chore), joinedload(Assignment.user))
+        .filter(Assignment.household_id == household_id)
+        .filter(Assignment.week_start_date == week_start)
+        .order_by(Assignment.due_date.asc())
+        .all()
+    )
+
+    # Week counts
+    pending_count = sum(1 for a in assignments if a.status == "pending")
+    done_count = sum(1 for a in assignments if a.status == "done")
+    missed_count = sum(1 for a in assignments if a.status == "missed")
+    reassigned_count = sum(1 for a in assignments if a.status == "reassigned")
+
+    # Reminders sent this week
+    reminders_sent = (
+        ReminderLog.query
+        .join(Assignment, ReminderLog.assignment_id == Assignment.id)
+        .filter(Assignment.household_id == household_id)
+        .filter(Assignment.week_start_date == week_start)
+        .filter(ReminderLog.status == "sent")
+        .count()
+    )
+
+    users = User.query.filter_by(household_id=household_id, is_active=True).all()
+    chores = Chore.query.filter_by(household_id=household_id).all()
+
+    return {
+        "week_start": week_start,
+        "assignments": assignments,
+        "pending_count": pending_count,
+        "done_count": done_count,
+        "missed_count": missed_count,
+        "reassigned_count": reassigned_count,
+        "reminders_sent": reminders_sent,
+        "debt_rows": debt_leaderboard(users, chores),
+        "chores": chores,
+        "monthly_rows": monthly_stats(users, month_start, household_id),
+        "month_start": month_start,
+    }
@@ -0,0 +1,64 @@
+from sqlalchemy import bindparam, case, update
+from app.extensions import db
+from app.models import Debt
+from app.services.bulk import insert_ignoring_conflicts
+
+
+def load_debt_matrix(user_ids, chore_ids) -> dict:
+    """
+    Whole users x chores debt matrix in one read.
+    Missing cells are 0 and are NOT written.
+    Returns {(user_id, chore_id): debt_count}
+    """
+    user_ids = list(user_ids)
+    chore_ids = list(chore_ids)
+
+    matrix = {(u, c): 0 for u in user_ids for c in chore_ids}
+    if not matrix:
+        return matrix
+
+    rows = (
+        db.session.query(Debt.user_id, Debt.chore_id, Debt.debt_count)
+        .filter(Debt.user_id.in_(user_ids), Debt.chore_id.in_(chore_ids))
+        .all()
+    )
+    for user_id, chore_id, count in rows:
+        matrix[(user_id, chore_id)] = count
+    return matrix
+
+
+def ensure_debt_rows(pairs):
+    """
+    Creates missing Debt rows for (user_id, chore_id) pairs with a single
+    INSERT ... ON CONFLICT DO NOTHING. Does not commit.
+    """
+    values = [
+        {"user_id": user_id, "chore_id": chore_id, "debt_count": 0}
+        for user_id, chore_id in set(pairs)
+    ]
+    insert_ignoring_conflicts(Debt, values, ["user_id", "chore_id"])
+
+
+def apply_debt_deltas(deltas: dict):
+    """
+    {(user_id, chore_id): delta} in one insert-ignore for missing rows plus
+    one executemany UPDATE. Relative updates, never below 0, so concurrent
+    changes to the same cell add up. Does not commit.
+    """
+    deltas = {pair: delta for pair, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    ensure_debt_rows(deltas)
+
+    table = Debt.__table__
+    new_count = table.c.debt_count + bindparam("delta")
+    stmt = (
+        update(table)
+        .where(table.c.user_id == bindparam("u"), table.c.chore_id == bindparam("c"))
+        .values(debt_count=case((new_count < 0, 0), else_=new_count))
+    )
+    db.session.execute(stmt, [
+        {"u": user_id, "c": chore_id, "delta": delta}
+        for (user_id, chore_id), delta in deltas.items()
+    ])
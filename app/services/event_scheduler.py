@@ -0,0 +1,126 @@
+"""
+Event-driven alternative to the hourly HTTP cron.
+
+Instead of waking every hour to find out whether anything is due, the
+scheduler works out the next moment something is: the next (weekday,
+hour) slot of the compiled reminder rules, or the weekly generation time
+(GENERATION_WEEKDAY / GENERATION_HOUR). It sleeps until exactly then and
+runs that work for every active household through the same fan-out as
+the cron endpoints.
+
+Chore edits in this process wake it up immediately (rule_index's
+rules_changed event). Edits made by other processes are seen after at
+most EVENT_SCHEDULER_MAX_SLEEP_SECONDS, when it re-reads the rules.
+
+Run it as its own process (python -m scripts.scheduler) or as a thread
+of the web app (EVENT_SCHEDULER_IN_PROCESS=1). Job leases keep several
+copies from sending anything twice. The /cron/* endpoints keep working.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from app.config import Config
+from app.extensions import db
+from app.services import rule_index
+from app.services.fanout import run_for_households
+from app.services.households import active_household_ids
+
+logger = logging.getLogger(__name__)
+
+
+def next_generation_after(after: datetime, weekday: int, hour: int) -> datetime:
+    moment = after.replace(minute=0, second=0, microsecond=0)
+    moment += timedelta(days=(weekday - moment.weekday()) % 7)
+    moment = moment.replace(hour=hour)
+    if moment <= after:
+        moment += timedelta(weeks=1)
+    return moment
+
+
+class EventScheduler:
+    def __init__(self, app, generation_weekday: int | None = None, generation_hour: int | None = None,
+                 max_sleep_seconds: float | None = None):
+        self.app = app
+        self.generation_weekday = Config.GENERATION_WEEKDAY if generation_weekday is None else generation_weekday
+        self.generation_hour = Config.GENERATION_HOUR if generation_hour is None else generation_hour
+        self.max_sleep_seconds = max_sleep_seconds or Config.EVENT_SCHEDULER_MAX_SLEEP_SECONDS
+        self.stopped = threading.Event()
+
+    def next_event(self, after: datetime) -> tuple:
+        """
+        (moment, [task, ...]) of the first work due strictly after `after`.
+        Generation runs before reminders falling on the same moment.
+        """
+        with self.app.app_context():
+            reminders_at = rule_index.get_rule_index().next_slot_after(after)
+            db.session.remove()
+
+        generation_at = next_generation_after(after, self.generation_weekday, self.generation_hour)
+
+        moment = min(m for m in (reminders_at, generation_at) if m is not None)
+        tasks = []
+        if moment == generation_at:
+            tasks.append("generate_weekly")
+        if moment == reminders_at:
+            tasks.append("send_reminders")
+        return moment, tasks
+
+    def run_tasks(self, moment: datetime, tasks: list) -> dict:
+        results = {}
+        with self.app.app_context():
+            try:
+                household_ids = active_household_ids()
+                for task in tasks:
+                    if task == "generate_weekly":
+                        results[task] = run_for_households(task, household_ids, today=moment.date())
+                    else:
+                        results[task] = run_for_households(task, household_ids, now=moment)
+            finally:
+                db.session.remove()
+
+        for task, per_household in results.items():
+            failed = [r["household_id"] for r in per_household if not r["ok"]]
+            logger.info("Scheduler ran %s for %s (%d households, failed: %s)",
+                        task, moment, len(per_household), failed or "none")
+        return results
+
+    def run_forever(self):
+        after = datetime.now()
+
+        while not self.stopped.is_set():
+            rule_index.rules_changed.clear()
+            moment, tasks = self.next_event(after)
+            delay = (moment - datetime.now()).total_seconds()
+
+            if delay > 0:
+                logger.info("Scheduler: next %s at %s", ", ".join(tasks), moment)
+                if rule_index.rules_changed.wait(min(delay, self.max_sleep_seconds)):
+                    continue   # chores changed, recompute
+                if self.stopped.is_set() or datetime.now() < moment:
+                    continue   # woke early to re-read rules
+
+            try:
+                self.run_tasks(moment, tasks)
+            except Exception:
+                logger.exception("Scheduler run for %s failed", moment)
+            after = moment
+
+    def stop(self):
+        self.stopped.set()
+        rule_index.rules_changed.set()
+
+
+_thread = None
+
+
+def start_in_background(app) -> EventScheduler:
+    """
+    Starts the scheduler as a daemon thread of this process (once).
+    """
+    global _thread
+
+    scheduler = EventScheduler(app)
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(target=scheduler.run_forever, name="event-scheduler", daemon=True)
+        _thread.start()
+    return scheduler
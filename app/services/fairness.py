@@ -1,37 +1,137 @@
 from datetime import date
 from sqlalchemy import func
-from app.models import Assignment, Debt, Absence, User, ChoreUserExclusion
+from app.models import Assignment, Chore, Debt, User, ChoreUserExclusion
 from app.extensions import db
+from app.services.absences import AbsenceIndex
 
 
-def get_or_create_debt(user_id: int, chore_id: int) -> Debt:
-    debt = Debt.query.filter_by(user_id=user_id, chore_id=chore_id).first()
-    if not debt:
-        debt = Debt(user_id=user_id, chore_id=chore_id, debt_count=0)
-        db.session.add(debt)
-        db.session.commit()
-    return debt
-
-
-def user_is_away_more_than_week_on_date(user_id: int, check_date: date) -> bool:
-    absences = Absence.query.filter_by(user_id=user_id).all()
-    for a in absences:
-        if a.start_date <= check_date <= a.end_date:
-            duration_days = (a.end_date - a.start_date).days + 1
-            return duration_days >= 7
-    return False
+def users_away_more_than_week_on_dates(pairs) -> dict:
+    """
+    Batch form: pairs is an iterable of (user_id, date), for example every
+    assignment due this week. One query for all of them.
+    Returns {(user_id, date): bool}
+    """
+    pairs = list(pairs)
+    index = AbsenceIndex.load(user_ids={user_id for user_id, _ in pairs})
+    return index.away_more_than_week_many(pairs)
 
 
-def get_last_assignment_date(user_id: int, chore_id: int):
-    last = (
-        db.session.query(func.max(Assignment.week_start_date))
-        .filter(Assignment.user_id == user_id, Assignment.chore_id == chore_id)
-        .scalar()
-    )
-    return last
+class FairnessSnapshot:
+    """
+    Everything the fairness rules need, loaded once in bulk.
 
+    One snapshot answers eligibility and ranking for every chore in a run
+    (weekly generation, a reassign, a cron call) without going back to the DB.
+    Call record_assignment() for rows created during the run so later picks
+    see them.
+    """
 
-def pick_assignee_for_chore(chore_id: int, due_date: date, exclude_user_ids=None):
+    def __init__(self, users, excluded_pairs, absences: AbsenceIndex, debts, last_dates):
+        self.users = users
+        self.excluded_pairs = excluded_pairs          # {(chore_id, user_id)}
+        self.absences = absences
+        self.debts = debts                            # {(user_id, chore_id): debt_count}
+        self.last_dates = last_dates                  # {(user_id, chore_id): week_start_date}
+
+    @classmethod
+    def load(cls, household_id: int | None = None, before: date | None = None):
+        """
+        household_id scopes every query to one household; None loads all.
+        before: only assignments of earlier weeks count as last turns, so
+        rows already planned for the weeks being generated don't skew the
+        rotation (the planner replays those itself).
+        """
+        users_q = User.query.filter_by(is_active=True)
+        if household_id is not None:
+            users_q = users_q.filter_by(household_id=household_id)
+        users = users_q.order_by(User.id.asc()).all()
+        user_ids = [u.id for u in users]
+
+        exclusions_q = db.session.query(ChoreUserExclusion.chore_id, ChoreUserExclusion.user_id)
+        debts_q = db.session.query(Debt.user_id, Debt.chore_id, Debt.debt_count)
+        last_q = db.session.query(
+            Assignment.user_id, Assignment.chore_id, func.max(Assignment.week_start_date)
+        )
+        if household_id is not None:
+            exclusions_q = exclusions_q.filter(ChoreUserExclusion.user_id.in_(user_ids))
+            debts_q = debts_q.filter(Debt.user_id.in_(user_ids))
+            last_q = last_q.filter(Assignment.household_id == household_id)
+        if before is not None:
+            last_q = last_q.filter(Assignment.week_start_date < before)
+
+        excluded_pairs = set(exclusions_q.all())
+
+        absences = AbsenceIndex.load(user_ids=user_ids if household_id is not None else None)
+
+        debts = {
+            (user_id, chore_id): count
+            for user_id, chore_id, count in debts_q.all()
+        }
+
+        last_dates = {
+            (user_id, chore_id): last
+            for user_id, chore_id, last in last_q.group_by(Assignment.user_id, Assignment.chore_id).all()
+        }
+
+        return cls(users, excluded_pairs, absences, debts, last_dates)
+
+    def is_away_more_than_week(self, user_id: int, check_date: date) -> bool:
+        return self.absences.is_away_more_than_week(user_id, check_date)
+
+    def is_eligible(self, user_id: int, chore_id: int, due_date: date) -> bool:
+        if (chore_id, user_id) in self.excluded_pairs:
+            return False
+        return not self.is_away_more_than_week(user_id, due_date)
+
+    def debt_for(self, user_id: int, chore_id: int) -> int:
+        return self.debts.get((user_id, chore_id), 0)
+
+    def last_date_for(self, user_id: int, chore_id: int):
+        return self.last_dates.get((user_id, chore_id))
+
+    def pick(self, chore_id: int, due_date: date, exclude_user_ids=None):
+        if exclude_user_ids is None:
+            exclude_user_ids = set()
+
+        eligible = []
+        for u in self.users:
+            if u.id in exclude_user_ids:
+                continue
+            if not self.is_eligible(u.id, chore_id, due_date):
+                continue
+
+            eligible.append({
+                "user": u,
+                "debt": self.debt_for(u.id, chore_id),
+                "last_date": self.last_date_for(u.id, chore_id)
+            })
+
+        if not eligible:
+            return None
+
+        def sort_key(x):
+            last = x["last_date"]
+            last_sort = last if last else date(1900, 1, 1)
+            return (-x["debt"], last_sort)
+
+        eligible.sort(key=sort_key)
+        return eligible[0]["user"]
+
+    def record_assignment(self, user_id: int, chore_id: int, week_start: date):
+        last = self.last_dates.get((user_id, chore_id))
+        if last is None or week_start > last:
+            self.last_dates[(user_id, chore_id)] = week_start
+
+    def settle_debt(self, user_id: int, chore_id: int):
+        """
+        In-memory only: used when simulating future weeks, where a planned
+        turn is assumed done and pays off one unit of debt.
+        """
+        if self.debts.get((user_id, chore_id), 0) > 0:
+            self.debts[(user_id, chore_id)] -= 1
+
+
+def pick_assignee_for_chore(chore_id: int, due_date: date, exclude_user_ids=None, snapshot=None):
     """
     Fairness rules:
     1) Only active users
@@ -40,43 +140,14 @@ def pick_assignee_for_chore(chore_id: int, due_date: date, exclude_user_ids=None
     4) Sort by:
         - highest debt_count for that chore
         - oldest last assignment date (rotation)
-    """
-    if exclude_user_ids is None:
-        exclude_user_ids = set()
-
-    users = User.query.filter_by(is_active=True).all()
-    eligible = []
 
-    for u in users:
-        if u.id in exclude_user_ids:
-            continue
-
-        excluded = ChoreUserExclusion.query.filter_by(
-            chore_id=chore_id,
-            user_id=u.id
-        ).first()
-        if excluded:
-            continue
-
-        if user_is_away_more_than_week_on_date(u.id, due_date):
-            continue
-
-        debt = get_or_create_debt(u.id, chore_id)
-        last_date = get_last_assignment_date(u.id, chore_id)
-
-        eligible.append({
-            "user": u,
-            "debt": debt.debt_count,
-            "last_date": last_date
-        })
-
-    if not eligible:
-        return None
-
-    def sort_key(x):
-        last = x["last_date"]
-        last_sort = last if last else date(1900, 1, 1)
-        return (-x["debt"], last_sort)
+    Pass a FairnessSnapshot to reuse one bulk load across many picks;
+    without one, only the chore's own household is loaded.
+    """
+    if snapshot is None:
+        chore = db.session.get(Chore, chore_id)
+        if chore is None:
+            return None
+        snapshot = FairnessSnapshot.load(chore.household_id)
 
-    eligible.sort(key=sort_key)
-    return eligible[0]["user"]
+    return snapshot.pick(chore_id, due_date, exclude_user_ids=exclude_user_ids)
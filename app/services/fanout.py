@@ -0,0 +1,128 @@
+"""
+Runs a cron task for many households across a process pool.
+
+Worker processes are spawned, not forked (the caller may be a web request
+or the in-process scheduler thread, and forking a threaded process copies
+held locks and open connections). Each builds its own app (so its own
+engine and session) once, then handles households one at a time. A failure in one household
+is rolled back and reported without affecting the others.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from app.config import Config
+from app.extensions import db
+from app.query_stats import track_queries
+from app.services.leases import job_lease
+
+logger = logging.getLogger(__name__)
+
+_worker_app = None
+
+
+def generation_lease_key(household_id: int) -> str:
+    # weekly and horizon generation share it: both write the same weeks
+    return f"generate:{household_id}"
+
+
+GENERATION_BUSY = {"created_count": 0, "created": [], "skipped": "generation already running"}
+
+
+def _task_generate_weekly(household_id: int, today: date, mode: str | None = None):
+    from app.services.scheduler import generate_weekly_assignments
+
+    with job_lease(generation_lease_key(household_id)) as acquired:
+        if not acquired:
+            return dict(GENERATION_BUSY)
+        created = generate_weekly_assignments(today=today, mode=mode, household_id=household_id)
+    return {
+        "created_count": len(created),
+        "created": [
+            {"id": a.id, "chore": a.chore.name, "user": a.user.name, "due": str(a.due_date)}
+            for a in created
+        ],
+    }
+
+
+def _task_horizon(household_id: int, today: date, weeks: int, mode: str | None = None):
+    from app.services.scheduler import generate_assignments_for_horizon
+
+    with job_lease(generation_lease_key(household_id)) as acquired:
+        if not acquired:
+            return dict(GENERATION_BUSY)
+        created = generate_assignments_for_horizon(weeks, today=today, mode=mode, household_id=household_id)
+    return {
+        "created_count": len(created),
+        "created": [
+            {"week": str(r["week_start_date"]), "chore": r["chore"], "user": r["user"], "due": str(r["due_date"])}
+            for r in created
+        ],
+    }
+
+
+def _task_send_reminders(household_id: int, now: datetime, force: bool = False):
+    from app.services.reminders import send_due_reminders
+
+    return {"sent_count": send_due_reminders(now=now, force=force, household_id=household_id)}
+
+
+TASKS = {
+    "generate_weekly": _task_generate_weekly,
+    "horizon": _task_horizon,
+    "send_reminders": _task_send_reminders,
+}
+
+
+def run_task_for_household(task: str, household_id: int, kwargs: dict) -> dict:
+    """
+    Runs one task in the current app context, isolating failures.
+    """
+    try:
+        with track_queries(f"cron {task} household={household_id}") as stats:
+            result = TASKS[task](household_id, **kwargs)
+        return {"household_id": household_id, "ok": True, "queries": stats.count, **result}
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Cron task %s failed for household %s", task, household_id)
+        return {"household_id": household_id, "ok": False, "error": str(e) or e.__class__.__name__}
+
+
+def _init_worker():
+    global _worker_app
+
+    from app import create_app
+    # the parent already did schema setup; don't race it from every worker
+    Config.DB_AUTO_INIT = False
+    _worker_app = create_app()
+
+
+def _run_in_worker(args) -> dict:
+    task, household_id, kwargs = args
+    with _worker_app.app_context():
+        try:
+            return run_task_for_household(task, household_id, kwargs)
+        finally:
+            db.session.remove()
+
+
+def run_for_households(task: str, household_ids: list, workers: int | None = None, **kwargs) -> list:
+    """
+    Returns one result dict per household, in household_ids order.
+    With one worker (or one household) everything runs in this process.
+    """
+    if workers is None:
+        workers = Config.CRON_WORKERS
+
+    if workers <= 1 or len(household_ids) <= 1:
+        return [run_task_for_household(task, h, kwargs) for h in household_ids]
+
+    jobs = [(task, h, kwargs) for h in household_ids]
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as pool:
+        return list(pool.map(_run_in_worker, jobs, chunksize=chunksize))
@@ -0,0 +1,89 @@
+"""
+Keeps User.feed_version / Household.feed_version current, so calendar
+feeds can answer "has anything changed?" from one row.
+
+A flush hook watches ORM changes to assignments, chores, users and
+households and bumps the affected versions in the same transaction.
+Writes that bypass the ORM (bulk inserts) call bump_feed_versions().
+"""
+from datetime import datetime
+from itertools import chain
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session, attributes
+from app.models import Assignment, Chore, Household, User
+
+
+def bump_feed_versions(connection, user_ids=(), household_ids=(), all_users_of_households=()):
+    now = datetime.now()
+    user_ids = {u for u in user_ids if u is not None}
+    all_users_of_households = {h for h in all_users_of_households if h is not None}
+    household_ids = {h for h in household_ids if h is not None} | all_users_of_households
+
+    if user_ids:
+        connection.execute(
+            update(User).where(User.id.in_(user_ids))
+            .values(feed_version=User.feed_version + 1, feed_updated_at=now)
+        )
+    if all_users_of_households:
+        connection.execute(
+            update(User).where(User.household_id.in_(all_users_of_households))
+            .values(feed_version=User.feed_version + 1, feed_updated_at=now)
+        )
+    if household_ids:
+        connection.execute(
+            update(Household).where(Household.id.in_(household_ids))
+            .values(feed_version=Household.feed_version + 1, feed_updated_at=now)
+        )
+
+
+def _changed(session, obj) -> bool:
+    return obj in session.new or obj in session.deleted or session.is_modified(obj)
+
+
+def _changed_attrs(obj, names) -> bool:
+    return any(attributes.get_history(obj, name).has_changes() for name in names)
+
+
+def _collect_feed_changes(session, flush_context, instances):
+    pending = session.info.setdefault("feed_changes", {"users": set(), "households": set(), "chores": set()})
+
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Assignment):
+            if not _changed(session, obj):
+                continue
+            # a reassignment changes both the old and the new user's feed
+            pending["users"].add(obj.user_id)
+            pending["users"].update(attributes.get_history(obj, "user_id").deleted)
+            pending["households"].add(obj.household_id)
+
+        elif isinstance(obj, Chore):
+            if obj in session.deleted or _changed_attrs(obj, ("name", "household_id")):
+                pending["chores"].add(obj.household_id)
+
+        elif isinstance(obj, User):
+            if obj not in session.new and _changed_attrs(obj, ("name", "household_id")):
+                pending["users"].add(obj.id)
+                pending["households"].add(obj.household_id)
+
+        elif isinstance(obj, Household):
+            if obj not in session.new and _changed_attrs(obj, ("name",)):
+                pending["households"].add(obj.id)
+
+
+def _apply_feed_changes(session, flush_context):
+    pending = session.info.pop("feed_changes", None)
+    if not pending or not any(pending.values()):
+        return
+
+    bump_feed_versions(
+        session.connection(),
+        user_ids=pending["users"],
+        household_ids=pending["households"],
+        all_users_of_households=pending["chores"],
+    )
+
+
+def install_feed_version_hooks():
+    if not event.contains(Session, "before_flush", _collect_feed_changes):
+        event.listen(Session, "before_flush", _collect_feed_changes)
+        event.listen(Session, "after_flush", _apply_feed_changes)
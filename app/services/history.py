@@ -0,0 +1,132 @@
+"""
+Assignment and reminder log history, newest first, with keyset
+pagination.
+
+Pages are addressed by a cursor holding the sort key of the row at their
+edge ((week_start_date, id) for assignments, (sent_at, id) for reminder
+logs) instead of an OFFSET. Each page is an index range scan that starts
+right at the cursor, so the last page of years of history costs the same
+as the first.
+"""
+from datetime import date, datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import contains_eager, joinedload
+from app.config import Config
+from app.models import Assignment, ReminderLog
+
+STATUSES = ["pending", "done", "missed", "reassigned"]
+
+
+class Page:
+    def __init__(self, items: list, older: str | None, newer: str | None):
+        self.items = items
+        self.older = older      # cursor of the next (older) page, None on the last one
+        self.newer = newer      # cursor of the previous (newer) page, None on the first one
+
+
+def encode_cursor(value, row_id: int) -> str:
+    return f"{value.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor: str, parse) -> tuple:
+    """
+    Raises ValueError for a malformed cursor.
+    """
+    value, row_id = cursor.rsplit("_", 1)
+    return parse(value), int(row_id)
+
+
+def beyond_cursor(key_col, id_col, value, row_id, older: bool):
+    """
+    (key, id) strictly past the cursor. Written as a range on key plus a
+    tie-break so the index seeks straight to it.
+    """
+    if older:
+        return and_(key_col <= value, or_(key_col < value, id_col < row_id))
+    return and_(key_col >= value, or_(key_col > value, id_col > row_id))
+
+
+def keyset_page(query, key_col, id_col, key_of, parse, older: str | None = None,
+                newer: str | None = None, limit: int | None = None) -> Page:
+    """
+    One page of `query` ordered by (key_col, id_col) descending.
+    older: cursor to continue after (towards older rows);
+    newer: cursor to go back from (towards newer rows);
+    neither: the newest page. key_of(row) returns the row's key value.
+    """
+    limit = limit or Config.HISTORY_PAGE_SIZE
+    cursor = older or newer
+    going_older = newer is None
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, parse)
+        query = query.filter(beyond_cursor(key_col, id_col, value, row_id, going_older))
+
+    if going_older:
+        query = query.order_by(key_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(key_col.asc(), id_col.asc())
+
+    rows = query.limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if not going_older:
+        rows.reverse()
+
+    if not rows:
+        return Page([], None, None)
+
+    first = encode_cursor(key_of(rows[0]), rows[0].id)
+    last = encode_cursor(key_of(rows[-1]), rows[-1].id)
+    if going_older:
+        return Page(rows, last if more else None, first if cursor else None)
+    return Page(rows, last, first if more else None)
+
+
+def _filtered(query, user_id=None, chore_id=None, status=None):
+    if user_id:
+        query = query.filter(Assignment.user_id == user_id)
+    if chore_id:
+        query = query.filter(Assignment.chore_id == chore_id)
+    if status:
+        query = query.filter(Assignment.status == status)
+    return query
+
+
+def assignment_history(household_id: int, user_id=None, chore_id=None, status=None,
+                       older=None, newer=None, limit=None) -> Page:
+    query = _filtered(
+        Assignment.query
+        .options(joinedload(Assignment.chore), joinedload(Assignment.user))
+        .filter(Assignment.household_id == household_id),
+        user_id, chore_id, status,
+    )
+    return keyset_page(
+        query, Assignment.week_start_date, Assignment.id,
+        key_of=lambda a: a.week_start_date, parse=date.fromisoformat,
+        older=older, newer=newer, limit=limit,
+    )
+
+
+def reminder_log_history(household_id: int, user_id=None, chore_id=None, status=None,
+                         older=None, newer=None, limit=None) -> Page:
+    """
+    status filters on the assignment's current status.
+    """
+    query = _filtered(
+        ReminderLog.query
+        .join(Assignment, ReminderLog.assignment_id == Assignment.id)
+        .options(
+            contains_eager(ReminderLog.assignment).joinedload(Assignment.chore),
+            contains_eager(ReminderLog.assignment).joinedload(Assignment.user),
+        )
+        .filter(Assignment.household_id == household_id)
+        .filter(ReminderLog.sent_at.isnot(None))
+        .filter(ReminderLog.status == "sent"),
+        user_id, chore_id, status,
+    )
+    return keyset_page(
+        query, ReminderLog.sent_at, ReminderLog.id,
+        key_of=lambda log: log.sent_at, parse=datetime.fromisoformat,
+        older=older, newer=newer, limit=limit,
+    )
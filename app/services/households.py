@@ -0,0 +1,55 @@
+from app.config import Config
+from app.extensions import db
+from app.models import Household
+
+
+def ensure_default_household() -> Household:
+    """
+    Creates the first household if there is none. Commits. Called by
+    init_db so read paths never have to write.
+    """
+    household = Household.query.order_by(Household.id.asc()).first()
+    if household:
+        return household
+
+    household = Household(name=Config.HOUSE_NAME, group_chat_name=Config.HOUSE_NAME)
+    db.session.add(household)
+    db.session.commit()
+    return household
+
+
+def get_default_household() -> Household:
+    """
+    The first household. Single-house deployments only ever use this one.
+    """
+    household = Household.query.order_by(Household.id.asc()).first()
+    if not household:
+        raise Exception("No household found. Run `flask init-db` (or python -m scripts.migrate) first.")
+    return household
+
+
+def resolve_household_id(household_id: int | None) -> int:
+    if household_id is not None:
+        return household_id
+    return get_default_household().id
+
+
+def active_household_ids() -> list:
+    return [
+        row.id for row in
+        db.session.query(Household.id).filter(Household.is_active.is_(True)).order_by(Household.id.asc()).all()
+    ]
+
+
+def group_chat_names(household_ids=None) -> dict:
+    """
+    {household_id: name used in messages}, falling back to the household
+    name and then HOUSE_NAME.
+    """
+    q = db.session.query(Household.id, Household.name, Household.group_chat_name)
+    if household_ids is not None:
+        q = q.filter(Household.id.in_(list(household_ids)))
+    return {
+        household_id: group_chat_name or name or Config.HOUSE_NAME
+        for household_id, name, group_chat_name in q.all()
+    }
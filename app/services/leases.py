@@ -0,0 +1,82 @@
+"""
+Job leases: lets several cron workers split the same work without doing
+any unit twice.
+
+A lease is a row in job_lease with a unique job_key. Claiming is one
+INSERT ... ON CONFLICT DO NOTHING per batch, so when two runs race for
+the same key exactly one insert lands. Leases expire after
+JOB_LEASE_TTL_SECONDS so work held by a crashed run is picked up again.
+"""
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from app.config import Config
+from app.extensions import db
+from app.models import JobLease
+from app.services.bulk import insert_ignoring_conflicts
+
+CLAIM_CHUNK = 500
+
+
+def new_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+def claim_leases(keys: list, holder: str | None = None, ttl_seconds: int | None = None) -> tuple:
+    """
+    Tries to claim every key. Commits. Returns (holder, set of keys this
+    holder now owns).
+    """
+    holder = holder or new_holder()
+    if ttl_seconds is None:
+        ttl_seconds = Config.JOB_LEASE_TTL_SECONDS
+    if not keys:
+        return holder, set()
+
+    now = datetime.now()
+    db.session.query(JobLease).filter(JobLease.expires_at < now).delete(synchronize_session=False)
+
+    rows = [
+        {"job_key": key, "holder": holder, "claimed_at": now, "expires_at": now + timedelta(seconds=ttl_seconds)}
+        for key in keys
+    ]
+    for i in range(0, len(rows), CLAIM_CHUNK):
+        insert_ignoring_conflicts(JobLease, rows[i:i + CLAIM_CHUNK], ["job_key"])
+    db.session.commit()
+
+    claimed = {
+        key for (key,) in db.session.query(JobLease.job_key).filter(JobLease.holder == holder).all()
+    }
+    return holder, claimed
+
+
+def release_leases(holder: str, keys: list | None = None):
+    """
+    Drops the holder's leases (all of them, or just `keys`). Commits.
+    """
+    q = db.session.query(JobLease).filter(JobLease.holder == holder)
+    if keys is not None:
+        q = q.filter(JobLease.job_key.in_(keys))
+    q.delete(synchronize_session=False)
+    db.session.commit()
+
+
+@contextmanager
+def job_lease(key: str, ttl_seconds: int | None = None):
+    """
+    with job_lease("generate:3") as acquired:
+        if not acquired:
+            return []   # someone else is on it
+    """
+    holder, claimed = claim_leases([key], ttl_seconds=ttl_seconds)
+    acquired = key in claimed
+    try:
+        yield acquired
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if acquired:
+            release_leases(holder)
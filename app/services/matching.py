@@ -0,0 +1,138 @@
+"""
+Optimal weekly matching of chores to users.
+
+Each week is an assignment problem: rows are the chores to fill, columns
+are user "slots". A user's first slot is a normal turn; further slots
+(a second chore the same week) carry a large penalty, so double-booking
+only happens when there is no other way to cover every chore.
+Exclusions and absences are hard constraints (the cell is left out).
+"""
+from datetime import date
+from app.services.fairness import FairnessSnapshot
+
+INF = float("inf")
+
+# debt dominates, then time since last turn (same order as the greedy pick)
+DEBT_WEIGHT = 1000
+MAX_WEEKS_SINCE = 520
+DUPLICATE_PENALTY = 1_000_000
+
+
+def hungarian(cost):
+    """
+    Min-cost assignment for an n x m matrix with n <= m (rows to distinct
+    columns). Cells may be INF for forbidden pairs.
+    Returns a list: row index -> column index, or None when a row can only
+    be matched through a forbidden cell.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+
+    # finite stand-in for INF so potentials stay numeric
+    finite = [c for row in cost for c in row if c != INF]
+    big = (2 * max(abs(c) for c in finite) + 1) * (n + 1) if finite else 1
+    a = [[big if c == INF else c for c in row] for row in cost]
+
+    # 1-indexed potentials / matching (classic O(n^2 m) formulation)
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)      # p[j] = row matched to column j
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = INF
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                cur = a[i0 - 1][j - 1] - u[i0] - v[j]
+                if cur < minv[j]:
+                    minv[j] = cur
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    result = [None] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            i = p[j] - 1
+            result[i] = None if cost[i][j - 1] == INF else j - 1
+    return result
+
+
+def turn_cost(snapshot: FairnessSnapshot, user_id: int, chore_id: int, week_start: date) -> int:
+    """
+    Lower is better: high debt and a long time since the last turn.
+    """
+    last = snapshot.last_date_for(user_id, chore_id)
+    if last is None:
+        weeks_since = MAX_WEEKS_SINCE
+    else:
+        weeks_since = min(MAX_WEEKS_SINCE, max(0, (week_start - last).days // 7))
+
+    return -(snapshot.debt_for(user_id, chore_id) * DEBT_WEIGHT) - weeks_since
+
+
+def solve_week(chores_due, week_start: date, snapshot: FairnessSnapshot, already_assigned_counts=None):
+    """
+    chores_due: [(chore, due_date), ...] still to be filled this week
+    already_assigned_counts: {user_id: chores they already hold this week}
+    Returns [(chore, user, due_date), ...] for every chore that has an
+    eligible user, optimal over the whole week.
+    """
+    if already_assigned_counts is None:
+        already_assigned_counts = {}
+
+    users = snapshot.users
+    if not chores_due or not users:
+        return []
+
+    slots_per_user = len(chores_due)
+    columns = [(u, k) for u in users for k in range(slots_per_user)]
+
+    cost = []
+    for chore, due_date in chores_due:
+        row = []
+        for u, k in columns:
+            if not snapshot.is_eligible(u.id, chore.id, due_date):
+                row.append(INF)
+                continue
+            held = already_assigned_counts.get(u.id, 0) + k
+            row.append(turn_cost(snapshot, u.id, chore.id, week_start) + held * DUPLICATE_PENALTY)
+        cost.append(row)
+
+    matching = hungarian(cost)
+
+    planned = []
+    for (chore, due_date), col in zip(chores_due, matching):
+        if col is None:
+            continue
+        planned.append((chore, columns[col][0], due_date))
+    return planned
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+from functools import lru_cache
+from string import Formatter
+from app.config import Config
+from app.services.garbage_cycle import garbage_bins_text
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "message_templates.json")
+
+# placeholders a template may use
+KNOWN_FIELDS = {"user", "chore", "due", "bins", "house", "rule_key"}
+
+
+@lru_cache(maxsize=512)
+def bins_text_for(due_date) -> str:
+    return garbage_bins_text(due_date)
+
+
+class MessageTemplate:
+    """
+    One compiled template: the format string plus the fields it uses,
+    so expensive context (bins text) is only computed when needed.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.fields = {name for _, name, _, _ in Formatter().parse(text) if name}
+
+        unknown = self.fields - KNOWN_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown template fields: {', '.join(sorted(unknown))}")
+
+    def render(self, context: dict) -> str:
+        return self.text.format_map(context)
+
+
+class TemplateRegistry:
+    """
+    Message templates keyed by chore name, optionally by rule key:
+
+        {"Garbage Cleanup": {"*": "...", "thursday": "..."}, "default": {"*": "..."}}
+
+    A value may be a string or a list of lines. Lookups are cached per
+    (chore name, rule key).
+    """
+
+    def __init__(self, raw: dict, house_name: str):
+        self.house_name = house_name
+        self.templates = {}
+        for chore_name, by_rule in raw.items():
+            self.templates[chore_name] = {
+                rule_key: MessageTemplate("\n".join(text) if isinstance(text, list) else text)
+                for rule_key, text in by_rule.items()
+            }
+
+        if "*" not in self.templates.get("default", {}):
+            raise ValueError("Message templates need a default \"*\" template.")
+
+        self._resolved = {}
+
+    @classmethod
+    def load(cls, path: str | None = None, house_name: str | None = None):
+        path = path or Config.MESSAGE_TEMPLATES_PATH or DEFAULT_TEMPLATES_PATH
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(raw, house_name or Config.HOUSE_NAME)
+
+    def resolve(self, chore_name: str, rule_key: str) -> MessageTemplate:
+        key = (chore_name, rule_key)
+        tmpl = self._resolved.get(key)
+        if tmpl is None:
+            by_rule = self.templates.get(chore_name) or self.templates["default"]
+            tmpl = by_rule.get(rule_key) or by_rule.get("*") or self.templates["default"]["*"]
+            self._resolved[key] = tmpl
+        return tmpl
+
+    def render(self, assignment, rule_key: str, house_name: str | None = None) -> str:
+        tmpl = self.resolve(assignment.chore.name, rule_key)
+
+        context = {
+            "user": assignment.user.name,
+            "chore": assignment.chore.name,
+            "due": assignment.due_date,
+            "house": house_name or self.house_name,
+            "rule_key": rule_key,
+        }
+        if "bins" in tmpl.fields:
+            context["bins"] = bins_text_for(assignment.due_date)
+
+        return tmpl.render(context)
+
+    def render_many(self, due, house_names=None) -> list:
+        """
+        due: [(assignment, rule_key), ...] -> [message, ...] in the same order
+        house_names: optional {household_id: group chat name}
+        """
+        house_names = house_names or {}
+        return [
+            self.render(a, rule_key, house_names.get(getattr(a, "household_id", None)))
+            for a, rule_key in due
+        ]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TemplateRegistry.load()
+    return _registry
+
+
+def reset_template_registry():
+    global _registry
+
+    with _registry_lock:
+        _registry = None
@@ -0,0 +1,243 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, tuple_, update
+from app.config import Config
+from app.extensions import db
+from app.metrics import MESSAGES_SENT, MESSAGES_FAILED
+from app.models import OutboxMessage, ReminderLog
+from app.query_stats import track_queries
+from app.services.bulk import insert_ignoring_conflicts
+from app.services.leases import new_holder
+from app.services.twilio_client import send_whatsapp_message
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_messages(messages, retry_failed: bool = False) -> int:
+    """
+    messages: rendered reminders (see reminders.render_due_reminders)
+    One bulk insert; a reminder already in the outbox is ignored, including
+    one that gave up as "failed" - unless retry_failed is set (forced runs),
+    which puts those back to pending with a fresh set of attempts.
+    Returns how many were queued.
+    """
+    now = datetime.now()
+    values = [
+        {
+            "assignment_id": m["assignment_id"],
+            "reminder_key": m["reminder_key"],
+            "to_e164": m["to"],
+            "body": m["body"],
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+        for m in messages
+    ]
+
+    queued = insert_ignoring_conflicts(
+        OutboxMessage, values, ["assignment_id", "reminder_key"]
+    )
+
+    if retry_failed and values:
+        queued += (
+            OutboxMessage.query
+            .filter(OutboxMessage.status == "failed")
+            .filter(tuple_(OutboxMessage.assignment_id, OutboxMessage.reminder_key).in_(
+                [(v["assignment_id"], v["reminder_key"]) for v in values]
+            ))
+            .update(
+                {"status": "pending", "attempts": 0, "next_attempt_at": now, "locked_at": None, "locked_by": None},
+                synchronize_session=False,
+            )
+        )
+
+    db.session.commit()
+    return queued
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    # 1st retry after base, then doubles each time
+    seconds = Config.OUTBOX_BACKOFF_SECONDS * (2 ** max(0, attempts - 1))
+    return timedelta(seconds=min(seconds, Config.OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+def _claimable(now: datetime):
+    stale = now - timedelta(seconds=Config.OUTBOX_LOCK_TIMEOUT_SECONDS)
+    return db.or_(
+        db.and_(
+            OutboxMessage.status == "pending",
+            OutboxMessage.next_attempt_at <= now,
+        ),
+        db.and_(
+            OutboxMessage.status == "sending",
+            OutboxMessage.locked_at < stale,
+        ),
+    )
+
+
+def claim_batch(batch_size: int, now: datetime | None = None):
+    """
+    Marks up to batch_size due messages as "sending" and returns them.
+    Messages stuck in "sending" past OUTBOX_LOCK_TIMEOUT_SECONDS (a worker
+    died mid-batch) are claimable again.
+
+    The UPDATE re-checks the claimable condition and stamps a token unique
+    to this call, and only rows carrying that token are returned, so two
+    workers that selected the same ids never both send them.
+    """
+    if not now:
+        now = datetime.now()
+
+    token = new_holder()
+
+    ids = [
+        row.id for row in (
+            db.session.query(OutboxMessage.id)
+            .filter(_claimable(now))
+            .order_by(OutboxMessage.next_attempt_at.asc(), OutboxMessage.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+    ]
+    if not ids:
+        return []
+
+    (
+        OutboxMessage.query
+        .filter(OutboxMessage.id.in_(ids), _claimable(now))
+        .update({"status": "sending", "locked_at": now, "locked_by": token}, synchronize_session=False)
+    )
+    db.session.commit()
+
+    return (
+        OutboxMessage.query
+        .filter(OutboxMessage.locked_by == token, OutboxMessage.status == "sending")
+        .order_by(OutboxMessage.id.asc())
+        .all()
+    )
+
+
+def _send(message: OutboxMessage):
+    try:
+        send_whatsapp_message(message.to_e164, message.body)
+        MESSAGES_SENT.inc(mode="outbox")
+        return None
+    except Exception as e:
+        MESSAGES_FAILED.inc(mode="outbox")
+        logger.warning("Outbox send failed (id=%s): %s", message.id, e)
+        return str(e) or e.__class__.__name__
+
+
+def _still_claimed(messages) -> set:
+    """
+    Ids of the messages still "sending" under the token they were claimed
+    with. A worker that stalled past OUTBOX_LOCK_TIMEOUT_SECONDS may have
+    lost some of them to another worker's claim.
+    """
+    rows = (
+        db.session.query(OutboxMessage.id, OutboxMessage.locked_by)
+        .filter(OutboxMessage.id.in_([m.id for m in messages]), OutboxMessage.status == "sending")
+        .all()
+    )
+    claimed_by = {m.id: m.locked_by for m in messages}
+    return {row.id for row in rows if row.locked_by == claimed_by[row.id]}
+
+
+def process_batch(messages, concurrency: int | None = None) -> dict:
+    """
+    Sends a claimed batch in parallel, then stores every status change and
+    the ReminderLog rows of sent reminders in one transaction.
+
+    Each status change is an UPDATE guarded by the claim token, so a
+    message reclaimed by another worker meanwhile keeps that worker's
+    attempts, status and next_attempt_at.
+    """
+    if concurrency is None:
+        concurrency = Config.REMINDER_CONCURRENCY
+
+    stats = {"sent": 0, "retry": 0, "failed": 0}
+    if not messages:
+        return stats
+
+    workers = max(1, min(concurrency, len(messages)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = list(pool.map(_send, messages))
+
+    now = datetime.now()
+    claimed = _still_claimed(messages)
+    outcomes = []
+    logs = []
+
+    for m, error in zip(messages, errors):
+        if m.id not in claimed:
+            logger.warning("Outbox message %s was reclaimed by another worker, leaving it to them", m.id)
+            continue
+
+        outcome = {
+            "_id": m.id,
+            "_token": m.locked_by,
+            "attempts": m.attempts + 1,
+            "next_attempt_at": m.next_attempt_at,
+            "sent_at": None,
+            "last_error": error,
+        }
+        outcomes.append(outcome)
+
+        if error is None:
+            outcome.update(status="sent", sent_at=now)
+            if m.assignment_id is not None and m.reminder_key:
+                logs.append({"assignment_id": m.assignment_id, "reminder_key": m.reminder_key, "sent_at": now})
+            stats["sent"] += 1
+        elif outcome["attempts"] >= Config.OUTBOX_MAX_ATTEMPTS:
+            outcome["status"] = "failed"
+            stats["failed"] += 1
+        else:
+            outcome.update(status="pending", next_attempt_at=now + backoff_delay(outcome["attempts"]))
+            stats["retry"] += 1
+
+    if outcomes:
+        table = OutboxMessage.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("_id"),
+                table.c.locked_by == bindparam("_token"),
+                table.c.status == "sending",
+            )
+            .values(locked_at=None, locked_by=None)
+        )
+        db.session.execute(stmt, outcomes)
+
+    insert_ignoring_conflicts(ReminderLog, logs, ["assignment_id", "reminder_key"])
+    db.session.commit()
+    return stats
+
+
+def drain_outbox(batch_size: int | None = None, max_batches: int | None = None) -> dict:
+    """
+    Claims and sends batches until nothing is due (or max_batches is hit).
+    """
+    if batch_size is None:
+        batch_size = Config.OUTBOX_BATCH_SIZE
+
+    totals = {"sent": 0, "retry": 0, "failed": 0, "batches": 0}
+
+    while max_batches is None or totals["batches"] < max_batches:
+        with track_queries("outbox batch"):
+            batch = claim_batch(batch_size)
+            if not batch:
+                break
+
+            stats = process_batch(batch)
+        for k, v in stats.items():
+            totals[k] += v
+        totals["batches"] += 1
+
+    return totals
+
+
+def outbox_depth() -> int:
+    return OutboxMessage.query.filter(OutboxMessage.status.in_(["pending", "sending"])).count()
@@ -1,117 +1,325 @@
-import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from app.config import Config
 from app.extensions import db
+from app.metrics import MESSAGES_SENT, MESSAGES_FAILED, REMINDER_WATERMARK_HELD
 from app.models import Assignment, ReminderLog
-from app.services.twilio_client import send_whatsapp_message
-from app.services.garbage_cycle import garbage_bins_text
+from app.services.bulk import insert_ignoring_conflicts
+from app.services.leases import claim_leases, release_leases
+from app.services.outbox import enqueue_messages
+from app.services.rule_index import get_rule_index
+from app.services.twilio_client import is_permanent_send_error, send_whatsapp_message
+from app.services.watermarks import get_watermark, advance_watermark
+from app.services.households import group_chat_names
+from app.services.message_templates import get_template_registry
+
+logger = logging.getLogger(__name__)
 
 
 def get_week_start(d: date) -> date:
     return d - timedelta(days=d.weekday())
 
 
-def should_send_for_rule(rule: dict, now: datetime) -> bool:
-    # rule: {"key":"monday","dow":0,"hour":9}
-    return now.weekday() == int(rule["dow"]) and now.hour == int(rule["hour"])
-
+def collect_due_reminders(now: datetime, force: bool = False, household_id: int | None = None,
+                          since: datetime | None = None):
+    """
+    Returns [(assignment, rule_key), ...] due and not sent yet, for one
+    household or all of them (household_id=None):
+    - force: every rule of this week's assignments
+    - since: every slot whose hour started in (since, now], so reminders
+      of runs that were skipped or late are caught up (once)
+    - otherwise: now's (weekday, hour) slot only
+    Uses the compiled rule index: an hour with no rules due costs nothing,
+    otherwise only assignments of chores due in those slots are loaded.
+    """
+    index = get_rule_index()
 
-def build_message(assignment: Assignment, rule_key: str) -> str:
-    chore = assignment.chore.name
-    user = assignment.user.name
-    due = assignment.due_date
+    # {week_start: {chore_id: [rule_key, ...]}}
+    wanted = {}
+    if force:
+        wanted[get_week_start(now.date())] = index.keys_by_chore
+    elif since is not None:
+        for moment, slot in index.due_between(since, now):
+            by_chore = wanted.setdefault(get_week_start(moment.date()), {})
+            for chore_id, keys in slot.items():
+                by_chore.setdefault(chore_id, []).extend(k for k in keys if k not in by_chore[chore_id])
+    else:
+        slot = index.due_at(now)
+        if slot:
+            wanted[get_week_start(now.date())] = slot
 
-    if "Garbage" in chore:
-        bins = garbage_bins_text(due)
+    if not wanted:
+        return []
 
-        if rule_key == "thursday":
-            return (
-                f"🚨 HIGH ALERT: \n\n Hey {user}, it's your turn for {chore}.\n"
-                f"Bins: {bins}\n\n"
-                f"Tonight:\n"
-                f"- Keep in-house garbage clear\n"
-                f"- Place bins near the curb\n\n"
-                f"Pickup: {due} (Friday morning)\n\n Thanks!"
-            )
+    q = (
+        Assignment.query
+        .options(joinedload(Assignment.chore), joinedload(Assignment.user))
+        .filter(Assignment.status == "pending")
+        .filter(or_(*[
+            and_(Assignment.week_start_date == week_start, Assignment.chore_id.in_(list(by_chore)))
+            for week_start, by_chore in wanted.items()
+        ]))
+    )
+    if household_id is not None:
+        q = q.filter(Assignment.household_id == household_id)
 
-        return (
-            f"🗑️ Reminder: \n\n Hey {user}, you are assigned: {chore}.\n\n"
-            f"Bins: {bins}\n\n"
-            f"This week:\n"
-            f"- If in-house bins are full, empty them into outside containers\n\n"
-            f"Pickup: {due} (Friday morning)\n\n Thanks!"
-        )
+    assignments = q.all()
+    if not assignments:
+        return []
 
-    # default for other chores
-    if "Washroom" in chore:
-        return (
-            f"🧼 Reminder: \n\n Hey {user}, it's your turn for: {chore}.\n\n"
-            f"Due date: {due}\n\n"
-            f"Please focus on:\n"
-            f"- Toilet, sink, and shower\n"
-            f"- Replace shower curtain if needed\n"
-            f"- Mop the floor\n\n"
-            f"Drop a message in '44 Perivale Cres' group chat with:\n"
-            f"- Done (✅)\n"
-            f"- Skip (❌)\n"
-            f"- Reassign (⏰)\n\nThanks!"
-        )
-    # Kitchen or other chores
-    return (
-        f"🧹 Reminder: \n\n Hey {user}, it's your turn for: {chore}\n\n"
-        f"Please focus on:\n"
-        f"- Sink\n"
-        f"- Kitchen Countertop\n"
-        f"- Kitchen Stove\n"
-        f"- Mop the floor\n\n"
-        f"Drop a message in '44 Perivale Cres' group chat with:\n"
-        f"- Done (✅)\n"
-        f"- Skip (❌)\n"
-        f"- Reassign (⏰)\n\nThanks!"
+    # sent, or rejected for good: either way not sent again
+    already_logged = set(
+        db.session.query(ReminderLog.assignment_id, ReminderLog.reminder_key)
+        .filter(ReminderLog.assignment_id.in_([a.id for a in assignments]))
+        .all()
     )
 
+    due = []
+    for a in assignments:
+        for reminder_key in wanted[a.week_start_date][a.chore_id]:
+            # prevent duplicates
+            if (a.id, reminder_key) in already_logged:
+                continue
 
-def send_due_reminders(now: datetime | None = None, force: bool = False):
-    if not now:
-        now = datetime.now()
+            due.append((a, reminder_key))
 
-    week_start = get_week_start(now.date())
+    return due
 
-    assignments = (
+
+def reminder_watermark_name(household_id: int | None) -> str:
+    return f"reminders:{household_id if household_id is not None else 'all'}"
+
+
+def evaluate_since(now: datetime, household_id: int | None) -> datetime:
+    """
+    Start of the window a run evaluates: the watermark, at most
+    REMINDER_CATCHUP_HOURS back. Without a watermark, just now's hour.
+    """
+    last = get_watermark(reminder_watermark_name(household_id))
+    if last is None:
+        return now.replace(minute=0, second=0, microsecond=0) - timedelta(microseconds=1)
+    return max(last, now - timedelta(hours=Config.REMINDER_CATCHUP_HOURS))
+
+
+def render_due_reminders(due):
+    """
+    Renders every message up front so the send phase only does I/O.
+    """
+    house_names = group_chat_names({a.household_id for a, _ in due}) if due else {}
+    bodies = get_template_registry().render_many(due, house_names=house_names)
+
+    return [
+        {
+            "assignment_id": a.id,
+            "reminder_key": reminder_key,
+            "to": a.user.phone_e164,
+            "body": body,
+        }
+        for (a, reminder_key), body in zip(due, bodies)
+    ]
+
+
+def reminder_lease_key(assignment_id: int, reminder_key: str) -> str:
+    return f"reminder:{assignment_id}:{reminder_key}"
+
+
+def claim_due_reminders(due) -> tuple:
+    """
+    Claims a lease per (assignment, rule) so concurrent runs split the
+    work instead of both sending. Returns (holder, the claimed part of due).
+    """
+    by_key = {reminder_lease_key(a.id, rule_key): (a.id, rule_key) for a, rule_key in due}
+    holder, claimed = claim_leases(list(by_key))
+    if not claimed:
+        return holder, []
+
+    mine = [pair for key, pair in by_key.items() if key in claimed]
+    ids = {assignment_id for assignment_id, _ in mine}
+
+    # the claim committed, which expired the collected assignments: reload
+    # them in one query instead of one lazy refresh each
+    assignments = {
+        a.id: a for a in
         Assignment.query
-        .filter(Assignment.week_start_date == week_start)
-        .filter(Assignment.status == "pending")
+        .options(joinedload(Assignment.chore), joinedload(Assignment.user))
+        .filter(Assignment.id.in_(ids), Assignment.status == "pending")
+        .all()
+    }
+
+    # a run that finished between our collect and our claim has already
+    # logged (and released) what it sent
+    sent = set(
+        db.session.query(ReminderLog.assignment_id, ReminderLog.reminder_key)
+        .filter(ReminderLog.assignment_id.in_(ids))
         .all()
     )
+    return holder, [
+        (assignments[assignment_id], rule_key) for assignment_id, rule_key in mine
+        if assignment_id in assignments and (assignment_id, rule_key) not in sent
+    ]
+
+
+def _send_one(message: dict) -> str:
+    """
+    "sent", "failed" (worth retrying) or "rejected" (permanent).
+    """
+    try:
+        send_whatsapp_message(message["to"], message["body"])
+        MESSAGES_SENT.inc(mode="concurrent")
+        return "sent"
+    except Exception as e:
+        MESSAGES_FAILED.inc(mode="concurrent")
+        logger.exception(
+            "Reminder send failed (assignment=%s, key=%s)",
+            message["assignment_id"], message["reminder_key"]
+        )
+        return "rejected" if is_permanent_send_error(e) else "failed"
+
+
+def dispatch_concurrent(messages, concurrency: int) -> tuple:
+    """
+    Sends rendered messages through a bounded thread pool, then records
+    the ReminderLog rows for the successful and the permanently rejected
+    ones in one transaction. Other failed sends get no log row so a later
+    run can retry them.
+    Returns (sent, retryable failures); permanent rejections are neither.
+    """
+    if not messages:
+        return 0, 0
 
+    workers = max(1, min(concurrency, len(messages)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_send_one, messages))
+
+    now = datetime.now()
+    insert_ignoring_conflicts(
+        ReminderLog,
+        [
+            {"assignment_id": m["assignment_id"], "reminder_key": m["reminder_key"], "sent_at": now, "status": outcome}
+            for m, outcome in zip(messages, results)
+            if outcome in ("sent", "rejected")
+        ],
+        ["assignment_id", "reminder_key"],
+    )
+    db.session.commit()
+
+    return results.count("sent"), results.count("failed")
+
+
+def dispatch_sequential(messages) -> int:
+    """
+    Fallback mode: one send, one ReminderLog commit at a time.
+    """
     sent_count = 0
 
-    for a in assignments:
-        rules = json.loads(a.chore.reminder_rules_json)
+    for m in messages:
+        try:
+            send_whatsapp_message(m["to"], m["body"])
+        except Exception as e:
+            MESSAGES_FAILED.inc(mode="sequential")
+            if is_permanent_send_error(e):
+                db.session.add(ReminderLog(
+                    assignment_id=m["assignment_id"],
+                    reminder_key=m["reminder_key"],
+                    status="rejected"
+                ))
+                db.session.commit()
+            raise
+        MESSAGES_SENT.inc(mode="sequential")
 
-        for rule in rules:
-            if not force and not should_send_for_rule(rule, now):
-                continue
+        db.session.add(ReminderLog(
+            assignment_id=m["assignment_id"],
+            reminder_key=m["reminder_key"]
+        ))
+        db.session.commit()
 
-            reminder_key = rule["key"]
+        sent_count += 1
 
-            # prevent duplicates
-            already_sent = ReminderLog.query.filter_by(
-                assignment_id=a.id,
-                reminder_key=reminder_key
-            ).first()
+    return sent_count
 
-            if already_sent:
-                continue
 
-            msg = build_message(a, reminder_key)
-            send_whatsapp_message(a.user.phone_e164, msg)
+def send_due_reminders(
+    now: datetime | None = None,
+    force: bool = False,
+    mode: str | None = None,
+    concurrency: int | None = None,
+    household_id: int | None = None,
+):
+    """
+    mode:
+    - concurrent: render all, send via a thread pool, one batched log commit
+    - sequential: send and commit one by one (previous behaviour)
+    - outbox: render all and enqueue in one insert, the outbox worker sends
+    Defaults come from REMINDER_DISPATCH_MODE / REMINDER_CONCURRENCY.
+    concurrent and sequential runs first claim a lease per (assignment,
+    rule), so overlapping runs never send the same reminder twice.
+    """
+    if not now:
+        now = datetime.now()
+
+    mode = (mode or Config.REMINDER_DISPATCH_MODE).lower().strip()
+    if concurrency is None:
+        concurrency = Config.REMINDER_CONCURRENCY
 
-            db.session.add(ReminderLog(
-                assignment_id=a.id,
-                reminder_key=reminder_key
-            ))
-            db.session.commit()
+    # with catch-up on, a run sends everything due since the last run's
+    # watermark; see settle_reminder_watermark for how far it moves
+    catch_up = not force and Config.REMINDER_CATCHUP_HOURS > 0
+    since = evaluate_since(now, household_id) if catch_up else None
 
-            sent_count += 1
+    due = collect_due_reminders(now, force=force, household_id=household_id, since=since)
 
-    return sent_count
\ No newline at end of file
+    if mode == "outbox":
+        # the outbox's unique (assignment, rule) already makes this idempotent;
+        # a forced run also re-queues reminders the outbox gave up on
+        sent = enqueue_messages(render_due_reminders(due), retry_failed=force)
+        retryable = 0
+    elif not due:
+        sent, retryable = 0, 0
+    else:
+        holder, due = claim_due_reminders(due)
+        try:
+            messages = render_due_reminders(due)
+
+            if mode == "sequential":
+                # raises on the first failure
+                sent, retryable = dispatch_sequential(messages), 0
+            else:
+                sent, retryable = dispatch_concurrent(messages, concurrency)
+        except Exception:
+            if catch_up:
+                db.session.rollback()
+                settle_reminder_watermark(household_id, now, retryable=1)
+            raise
+        finally:
+            db.session.rollback()
+            release_leases(holder)
+
+    if catch_up:
+        settle_reminder_watermark(household_id, now, retryable)
+
+    return sent
+
+
+def settle_reminder_watermark(household_id: int | None, now: datetime, retryable: int):
+    """
+    After a run, moves the catch-up watermark to now when nothing is left
+    to retry. Retryable failures hold it back so the next runs send them
+    again, but only for REMINDER_RETRY_HOURS: slots older than that are
+    given up, so one recipient that keeps failing can't pin it for good.
+    Permanent rejections (an invalid number) never hold it: they are
+    logged as "rejected" and not sent again. Commits.
+    """
+    name = reminder_watermark_name(household_id)
+    if not retryable:
+        advance_watermark(name, now)
+    else:
+        advance_watermark(name, now - timedelta(hours=Config.REMINDER_RETRY_HOURS))
+        REMINDER_WATERMARK_HELD.inc(household="all" if household_id is None else str(household_id))
+        logger.warning(
+            "Reminder watermark %s held at %s by %d failed send(s); retried for up to %dh",
+            name, get_watermark(name), retryable, Config.REMINDER_RETRY_HOURS,
+        )
+    db.session.commit()
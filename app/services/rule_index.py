@@ -0,0 +1,122 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from app.config import Config
+from app.extensions import db
+from app.models import Chore
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderRuleIndex:
+    """
+    All chores' reminder rules compiled into (weekday, hour) slots.
+
+    slots[(dow, hour)] -> {chore_id: [rule_key, ...]}
+    A tick looks up its slot and only touches the chores listed there.
+    """
+
+    def __init__(self, rules_by_chore):
+        # rules_by_chore: {chore_id: [{"key":..,"dow":..,"hour":..}, ...]}
+        self.slots = defaultdict(dict)
+        self.keys_by_chore = {}
+
+        for chore_id, rules in rules_by_chore.items():
+            try:
+                compiled = [((int(r["dow"]), int(r["hour"])), r["key"]) for r in rules]
+            except (KeyError, ValueError, TypeError):
+                logger.warning("Chore %s has malformed reminder rules, skipping", chore_id)
+                continue
+
+            keys = []
+            for slot, key in compiled:
+                self.slots[slot].setdefault(chore_id, []).append(key)
+                keys.append(key)
+            if keys:
+                self.keys_by_chore[chore_id] = keys
+
+        self.slots = dict(self.slots)
+
+    @classmethod
+    def load(cls):
+        rules_by_chore = {}
+        for chore_id, raw in db.session.query(Chore.id, Chore.reminder_rules_json).all():
+            try:
+                rules_by_chore[chore_id] = json.loads(raw or "[]")
+            except (ValueError, TypeError):
+                logger.warning("Chore %s has invalid reminder_rules_json, skipping", chore_id)
+        return cls(rules_by_chore)
+
+    def due_at(self, now: datetime) -> dict:
+        """
+        {chore_id: [rule_key, ...]} due in now's (weekday, hour) slot.
+        """
+        return self.slots.get((now.weekday(), now.hour), {})
+
+    def due_between(self, start: datetime, end: datetime) -> list:
+        """
+        [(moment, {chore_id: [rule_key, ...]}), ...] for every slot whose
+        hour starts in (start, end], oldest first.
+        """
+        due = []
+        moment = start.replace(minute=0, second=0, microsecond=0)
+        if moment <= start:
+            moment += timedelta(hours=1)
+
+        while moment <= end:
+            slot = self.slots.get((moment.weekday(), moment.hour))
+            if slot:
+                due.append((moment, slot))
+            moment += timedelta(hours=1)
+        return due
+
+    def next_slot_after(self, after: datetime) -> datetime | None:
+        """
+        Start of the first hour strictly after `after` that has rules due,
+        or None when no chore has reminder rules.
+        """
+        if not self.slots:
+            return None
+
+        moment = after.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        for _ in range(7 * 24):
+            if (moment.weekday(), moment.hour) in self.slots:
+                return moment
+            moment += timedelta(hours=1)
+        return None
+
+
+_index = None
+_index_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+# set on every invalidation, so a scheduler sleeping in this process can
+# recompute its next wake-up right away
+rules_changed = threading.Event()
+
+
+def get_rule_index() -> ReminderRuleIndex:
+    """
+    Process-wide compiled index. Rebuilt after invalidate_rule_index()
+    (chore create/update in this process) or after
+    REMINDER_INDEX_TTL_SECONDS, which covers edits made by other workers.
+    """
+    global _index, _index_loaded_at
+
+    with _index_lock:
+        expired = time.monotonic() - _index_loaded_at > Config.REMINDER_INDEX_TTL_SECONDS
+        if _index is None or expired:
+            _index = ReminderRuleIndex.load()
+            _index_loaded_at = time.monotonic()
+        return _index
+
+
+def invalidate_rule_index():
+    global _index
+
+    with _index_lock:
+        _index = None
+    rules_changed.set()
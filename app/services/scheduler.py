@@ -1,7 +1,11 @@
 from datetime import date, timedelta
+from app.config import Config
 from app.extensions import db
 from app.models import Chore, Assignment
-from app.services.fairness import pick_assignee_for_chore
+from app.services.feed_versions import bump_feed_versions
+from app.services.fairness import FairnessSnapshot, pick_assignee_for_chore
+from app.services.households import resolve_household_id
+from app.services.matching import solve_week
 
 
 def get_week_start(d: date) -> date:
@@ -28,59 +32,190 @@ def due_date_for_week(chore: Chore, week_start: date) -> date:
     return week_start + timedelta(days=chore.day_of_week)
 
 
-def generate_weekly_assignments(today: date | None = None):
+def plan_week(chores, week_start: date, existing_by_chore: dict, snapshot: FairnessSnapshot,
+              mode: str | None = None):
     """
-    Creates assignments for current week.
-    Safe to run multiple times (won't duplicate).
+    Picks assignees for one week in memory.
+    existing_by_chore: {chore_id: user_id} already assigned that week.
+    mode: "greedy" (chore by chore) or "optimal" (whole-week matching),
+    defaults to SCHEDULER_MODE.
+    Returns [(chore, assignee, due_date), ...] for the missing ones and
+    records them in the snapshot so later picks see them.
     """
-    if not today:
-        today = date.today()
-
-    week_start = get_week_start(today)
-    chores = Chore.query.all()
+    mode = (mode or Config.SCHEDULER_MODE).lower().strip()
+    if mode == "optimal":
+        return _plan_week_optimal(chores, week_start, existing_by_chore, snapshot)
 
-    created = []
-    already_assigned_user_ids = set()
+    planned = []
+    already_assigned_user_ids = set(existing_by_chore.values())
 
     for chore in chores:
         if not should_generate_for_week(chore, week_start):
             continue
 
-        due_date = due_date_for_week(chore, week_start)
-
-        existing = Assignment.query.filter_by(
-            chore_id=chore.id,
-            week_start_date=week_start
-        ).first()
-        if existing:
-            already_assigned_user_ids.add(existing.user_id)
+        if chore.id in existing_by_chore:
             continue
 
+        due_date = due_date_for_week(chore, week_start)
+
         # 1) First try: avoid assigning someone already assigned this week
         assignee = pick_assignee_for_chore(
             chore.id,
             due_date,
-            exclude_user_ids=already_assigned_user_ids
+            exclude_user_ids=already_assigned_user_ids,
+            snapshot=snapshot
         )
 
         # 2) Fallback: if not possible, allow duplicates
         if not assignee:
-            assignee = pick_assignee_for_chore(chore.id, due_date, exclude_user_ids=set())
+            assignee = pick_assignee_for_chore(
+                chore.id, due_date, exclude_user_ids=set(), snapshot=snapshot
+            )
 
         if not assignee:
             continue
 
-        assignment = Assignment(
-            chore_id=chore.id,
-            user_id=assignee.id,
-            week_start_date=week_start,
-            due_date=due_date,
-            status="pending"
-        )
-
-        db.session.add(assignment)
-        created.append(assignment)
+        snapshot.record_assignment(assignee.id, chore.id, week_start)
+        planned.append((chore, assignee, due_date))
         already_assigned_user_ids.add(assignee.id)
 
+    return planned
+
+
+def _plan_week_optimal(chores, week_start: date, existing_by_chore: dict, snapshot: FairnessSnapshot):
+    chores_due = [
+        (chore, due_date_for_week(chore, week_start))
+        for chore in chores
+        if should_generate_for_week(chore, week_start) and chore.id not in existing_by_chore
+    ]
+
+    already_assigned_counts = {}
+    for user_id in existing_by_chore.values():
+        already_assigned_counts[user_id] = already_assigned_counts.get(user_id, 0) + 1
+
+    planned = solve_week(chores_due, week_start, snapshot, already_assigned_counts)
+    for chore, assignee, _ in planned:
+        snapshot.record_assignment(assignee.id, chore.id, week_start)
+    return planned
+
+
+def generate_weekly_assignments(today: date | None = None, snapshot: FairnessSnapshot | None = None,
+                                mode: str | None = None, household_id: int | None = None):
+    """
+    Creates assignments for current week, for one household
+    (the default one when household_id is None).
+    Safe to run multiple times (won't duplicate).
+    """
+    if not today:
+        today = date.today()
+
+    household_id = resolve_household_id(household_id)
+    week_start = get_week_start(today)
+    chores = Chore.query.filter_by(household_id=household_id).all()
+
+    if snapshot is None:
+        snapshot = FairnessSnapshot.load(household_id, before=week_start)
+
+    existing_by_chore = {
+        chore_id: user_id
+        for chore_id, user_id in db.session.query(Assignment.chore_id, Assignment.user_id)
+        .filter(Assignment.household_id == household_id)
+        .filter(Assignment.week_start_date == week_start)
+        .all()
+    }
+
+    rows = [
+        {
+            "household_id": household_id,
+            "chore_id": chore.id,
+            "user_id": assignee.id,
+            "week_start_date": week_start,
+            "due_date": due_date,
+            "status": "pending",
+        }
+        for chore, assignee, due_date in plan_week(chores, week_start, existing_by_chore, snapshot, mode=mode)
+    ]
+
+    created = []
+    if rows:
+        # one batched INSERT ... RETURNING instead of one INSERT per chore
+        created = db.session.scalars(
+            db.insert(Assignment).returning(Assignment), rows
+        ).all()
+        # bulk inserts skip the ORM flush hook
+        bump_feed_versions(db.session.connection(), {r["user_id"] for r in rows}, [household_id])
+    db.session.commit()
+    return created
+
+
+def generate_assignments_for_horizon(weeks: int, today: date | None = None,
+                                     snapshot: FairnessSnapshot | None = None,
+                                     mode: str | None = None, household_id: int | None = None):
+    """
+    Plans `weeks` weeks starting with the current one in a single pass and
+    writes every new row with one bulk insert.
+    Rotation, debt and absences are simulated week by week in memory:
+    a planned assignment counts as the assignee's latest turn and is
+    assumed done, so it pays off one unit of their debt for that chore.
+    Rows that already exist in the horizon are replayed the same way in
+    their own week (open ones also pay off debt), so a later week never
+    sees them early.
+    Safe to run multiple times (won't duplicate).
+    Returns the inserted rows as dicts.
+    """
+    if not today:
+        today = date.today()
+
+    household_id = resolve_household_id(household_id)
+    first_week = get_week_start(today)
+    week_starts = [first_week + timedelta(weeks=i) for i in range(weeks)]
+    chores = Chore.query.filter_by(household_id=household_id).all()
+
+    if snapshot is None:
+        snapshot = FairnessSnapshot.load(household_id, before=first_week)
+
+    existing = {}
+    open_existing = {}
+    for chore_id, user_id, week_start, status in (
+        db.session.query(Assignment.chore_id, Assignment.user_id, Assignment.week_start_date, Assignment.status)
+        .filter(Assignment.household_id == household_id)
+        .filter(Assignment.week_start_date >= week_starts[0])
+        .filter(Assignment.week_start_date <= week_starts[-1])
+        .all()
+    ):
+        existing.setdefault(week_start, {})[chore_id] = user_id
+        # done / missed rows already moved the stored debt
+        if status in ("pending", "reassigned"):
+            open_existing.setdefault(week_start, []).append((user_id, chore_id))
+
+    rows = []
+    for week_start in week_starts:
+        for chore_id, user_id in existing.get(week_start, {}).items():
+            snapshot.record_assignment(user_id, chore_id, week_start)
+        for user_id, chore_id in open_existing.get(week_start, []):
+            snapshot.settle_debt(user_id, chore_id)
+
+        for chore, assignee, due_date in plan_week(
+            chores, week_start, existing.get(week_start, {}), snapshot, mode=mode
+        ):
+            snapshot.settle_debt(assignee.id, chore.id)
+            rows.append({
+                "household_id": household_id,
+                "chore_id": chore.id,
+                "user_id": assignee.id,
+                "week_start_date": week_start,
+                "due_date": due_date,
+                "status": "pending",
+                "chore": chore.name,
+                "user": assignee.name,
+            })
+
+    if rows:
+        db.session.execute(
+            db.insert(Assignment),
+            [{k: v for k, v in r.items() if k not in ("chore", "user")} for r in rows]
+        )
+        # bulk inserts skip the ORM flush hook
+        bump_feed_versions(db.session.connection(), {r["user_id"] for r in rows}, [household_id])
     db.session.commit()
-    return created
\ No newline at end of file
+    return rows
@@ -1,38 +1,125 @@
-from datetime import datetime
-from twilio.rest import Client
+import threading
 from app.config import Config
-from app.extensions import db
-from app.models import User
+from app.metrics import SEND_LATENCY
 
 
-def send_whatsapp_message(to_e164: str, message: str):
+class FakeTransport:
     """
-    Two modes:
-    - fake: prints to console only
-    - real: sends via Twilio
+    Prints to console only.
     """
-    mode = Config.WHATSAPP_MODE.lower().strip()
+    mode = "fake"
 
-    if mode == "fake":
+    def send(self, to_e164: str, message: str):
         print("📨 [FAKE WHATSAPP]")
         print("TO:", to_e164)
         print("MSG:", message)
         print("----")
         return {"mode": "fake", "to": to_e164, "message": message}
 
-    # real mode
+
+class TwilioTransport:
+    """
+    Sends via Twilio. One Client per process, backed by a keep-alive
+    requests session whose connection pool is sized for concurrent sends.
+    The SDK is imported here, on first use, so fake mode and processes
+    that never send don't pay for it at startup.
+    """
+    mode = "real"
+
+    def __init__(self, account_sid: str, auth_token: str, from_: str,
+                 pool_size: int = 8, timeout: float | None = None):
+        from requests.adapters import HTTPAdapter
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        http_client = TwilioHttpClient(pool_connections=True, timeout=timeout)
+        http_client.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+
+        self.client = Client(account_sid, auth_token, http_client=http_client)
+        self.from_ = from_
+
+    def send(self, to_e164: str, message: str):
+        msg = self.client.messages.create(
+            from_=self.from_,
+            to=f"whatsapp:{to_e164}",
+            body=message
+        )
+        return {"mode": "real", "sid": msg.sid}
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def validate_transport_config():
+    """
+    Checked once at startup instead of on every send.
+    """
+    mode = Config.WHATSAPP_MODE.lower().strip()
+    if mode == "fake":
+        return
+
     if not Config.TWILIO_ACCOUNT_SID or not Config.TWILIO_AUTH_TOKEN:
         raise Exception("Twilio credentials missing. Set TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN.")
 
     if not Config.TWILIO_WHATSAPP_FROM:
         raise Exception("TWILIO_WHATSAPP_FROM missing, example: whatsapp:+14155238886")
 
-    client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
 
-    msg = client.messages.create(
-        from_=Config.TWILIO_WHATSAPP_FROM,
-        to=f"whatsapp:{to_e164}",
-        body=message
+def build_transport():
+    mode = Config.WHATSAPP_MODE.lower().strip()
+
+    if mode == "fake":
+        return FakeTransport()
+
+    validate_transport_config()
+    return TwilioTransport(
+        Config.TWILIO_ACCOUNT_SID,
+        Config.TWILIO_AUTH_TOKEN,
+        Config.TWILIO_WHATSAPP_FROM,
+        pool_size=Config.TWILIO_POOL_SIZE,
+        timeout=Config.TWILIO_TIMEOUT,
     )
 
-    return {"mode": "real", "sid": msg.sid}
+
+def get_transport():
+    """
+    Process-wide transport, built on first use.
+    """
+    global _transport
+
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = build_transport()
+    return _transport
+
+
+def reset_transport():
+    global _transport
+
+    with _transport_lock:
+        _transport = None
+
+
+def is_permanent_send_error(exc: Exception) -> bool:
+    """
+    Twilio answers 4xx for requests that will never succeed (invalid or
+    unreachable number, bad body). 429 is rate limiting, worth retrying.
+    """
+    status = getattr(exc, "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+def send_whatsapp_message(to_e164: str, message: str):
+    """
+    Two modes:
+    - fake: prints to console only
+    - real: sends via Twilio
+    """
+    transport = get_transport()
+    with SEND_LATENCY.time(transport=transport.mode):
+        return transport.send(to_e164, message)
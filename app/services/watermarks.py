@@ -0,0 +1,25 @@
+from datetime import datetime
+from app.extensions import db
+from app.models import Watermark
+from app.services.bulk import insert_ignoring_conflicts
+
+
+def get_watermark(name: str) -> datetime | None:
+    return db.session.query(Watermark.value).filter(Watermark.name == name).scalar()
+
+
+def advance_watermark(name: str, value: datetime):
+    """
+    Moves the watermark forward to `value` (never backwards, so an older
+    run finishing late can't undo a newer one). Does not commit.
+    """
+    now = datetime.now()
+    inserted = insert_ignoring_conflicts(
+        Watermark, [{"name": name, "value": value, "updated_at": now}], ["name"]
+    )
+    if not inserted:
+        (
+            db.session.query(Watermark)
+            .filter(Watermark.name == name, Watermark.value < value)
+            .update({"value": value, "updated_at": now}, synchronize_session=False)
+        )
@@ -1,6 +1,11 @@
 from app import create_app
+from app.config import Config
 
 app = create_app()
 
+if Config.EVENT_SCHEDULER_IN_PROCESS:
+    from app.services.event_scheduler import start_in_background
+    start_in_background(app)
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,261 @@
+"""
+Microbenchmarks for the services layer and admin views.
+
+    python -m scripts.bench_services --scales small,medium
+    python -m scripts.bench_services --compare bench_results/<old>.json
+
+Each scale point gets a fresh SQLite database filled by
+scripts.synthetic_data, then every benchmark is timed and its SQL
+statements counted. Results are written as JSON (one file per commit by
+default) so two runs can be compared.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+SCALES = {
+    "small": {"users": 10, "chores": 5, "years": 1, "reminder_logs": 500, "exclusions": 5},
+    "medium": {"users": 50, "chores": 20, "years": 3, "reminder_logs": 5000, "exclusions": 40},
+    "large": {"users": 200, "chores": 50, "years": 5, "reminder_logs": 20000, "exclusions": 200},
+}
+
+# max SQL statements per call, checked with --check-budgets; these should
+# not grow with the number of users, chores or history rows
+QUERY_BUDGETS = {
+    "generate_weekly_assignments": 10,
+    "pick_assignee_for_chore": 6,
+    "collect_due_reminders": 3,
+    # concurrent dispatch, the default mode
+    "send_due_reminders": 12,
+    "GET /admin/": 10,
+    "GET /admin/debts": 6,
+    "GET /admin/assignments": 6,
+    "GET /admin/reminder-logs": 6,
+    "GET /admin/assignments/history": 6,
+    "GET /admin/reminder-logs/history": 6,
+    "GET /admin/assignments/history (last page)": 6,
+    "GET /admin/reminder-logs/history (last page)": 6,
+}
+
+
+class NullTransport:
+    mode = "bench"
+
+    def send(self, to_e164: str, message: str):
+        return {"mode": "bench"}
+
+
+def _git_sha() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def _measure(name: str, fn, query_stats, repeat: int) -> dict:
+    """
+    Times fn and counts its statements under query_budget(), so a call
+    over its QUERY_BUDGETS entry keeps the error with its slowest queries.
+    """
+    budget = QUERY_BUDGETS.get(name)
+    timings, queries, over_budget = [], [], None
+    for i in range(repeat):
+        try:
+            with query_stats.query_budget(sys.maxsize if budget is None else budget, name) as stats:
+                start = time.perf_counter()
+                fn(i)
+                timings.append((time.perf_counter() - start) * 1000)
+        except query_stats.QueryBudgetExceeded as e:
+            over_budget = str(e)
+        queries.append(stats.count)
+    result = {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "queries": max(queries),
+        "repeat": repeat,
+    }
+    if over_budget:
+        result["over_budget"] = over_budget
+    return result
+
+
+def run_scale(name: str, params: dict, repeat: int, seed: int) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ["WHATSAPP_MODE"] = "fake"
+
+    # Config reads the environment at import time
+    for module in [m for m in sys.modules if m in ("app", "scripts.synthetic_data") or m.startswith("app.")]:
+        del sys.modules[module]
+
+    from app import create_app, query_stats
+    from app.extensions import db
+    from app.migrations import init_db
+    from app.models import Assignment, Chore, Household, ReminderLog
+    from app.services import twilio_client
+    from app.services.fairness import pick_assignee_for_chore
+    from app.services.history import encode_cursor
+    from app.services.reminders import collect_due_reminders, send_due_reminders
+    from app.services.scheduler import generate_weekly_assignments
+    from scripts.synthetic_data import generate
+
+    app = create_app()
+    app.config["TESTING"] = True
+    twilio_client._transport = NullTransport()
+
+    results = {"params": params, "benchmarks": {}}
+
+    with app.app_context():
+        init_db()
+
+        start = time.perf_counter()
+        results["rows"] = generate(seed=seed, **params)
+        results["generate_s"] = round(time.perf_counter() - start, 3)
+
+        household_id = db.session.query(Household.id).order_by(Household.id.desc()).first()[0]
+        chore = Chore.query.filter_by(household_id=household_id).first()
+
+        today = date.today()
+        b = results["benchmarks"]
+
+        # a different future week each time, so every run really generates
+        b["generate_weekly_assignments"] = _measure(
+            "generate_weekly_assignments",
+            lambda i: generate_weekly_assignments(
+                today=today + timedelta(weeks=10 + i), household_id=household_id
+            ),
+            query_stats, repeat,
+        )
+
+        b["pick_assignee_for_chore"] = _measure(
+            "pick_assignee_for_chore",
+            lambda i: pick_assignee_for_chore(chore.id, today),
+            query_stats, repeat,
+        )
+
+        generate_weekly_assignments(today=today, household_id=household_id)
+        b["collect_due_reminders"] = _measure(
+            "collect_due_reminders",
+            lambda i: collect_due_reminders(datetime.now(), force=True, household_id=household_id),
+            query_stats, repeat,
+        )
+        b["send_due_reminders"] = _measure(
+            "send_due_reminders",
+            lambda i: send_due_reminders(now=datetime.now(), force=True, household_id=household_id),
+            query_stats, 1,
+        )
+
+        client = app.test_client()
+        client.post("/login", data={"username": app.config["ADMIN_USERNAME"], "password": app.config["ADMIN_PASSWORD"]})
+        with client.session_transaction() as s:
+            s["household_id"] = household_id
+
+        paths = [
+            "/admin/", "/admin/debts", "/admin/assignments", "/admin/reminder-logs",
+            "/admin/assignments/history", "/admin/reminder-logs/history",
+        ]
+        for path in paths:
+            b[f"GET {path}"] = _measure(f"GET {path}", lambda i, p=path: client.get(p), query_stats, repeat)
+
+        # the oldest page of history should cost the same as the newest
+        page_size = app.config["HISTORY_PAGE_SIZE"]
+        oldest = (
+            Assignment.query.filter_by(household_id=household_id)
+            .order_by(Assignment.week_start_date.asc(), Assignment.id.asc())
+            .offset(page_size).first()
+        )
+        oldest_log = (
+            ReminderLog.query.join(Assignment, ReminderLog.assignment_id == Assignment.id)
+            .filter(Assignment.household_id == household_id)
+            .order_by(ReminderLog.sent_at.asc(), ReminderLog.id.asc())
+            .offset(page_size).first()
+        )
+        last_pages = {
+            "/admin/assignments/history": oldest and encode_cursor(oldest.week_start_date, oldest.id),
+            "/admin/reminder-logs/history": oldest_log and encode_cursor(oldest_log.sent_at, oldest_log.id),
+        }
+        for path, cursor in last_pages.items():
+            if cursor:
+                b[f"GET {path} (last page)"] = _measure(
+                    f"GET {path} (last page)",
+                    lambda i, p=path, c=cursor: client.get(p, query_string={"older": c}), query_stats, repeat,
+                )
+
+    return results
+
+
+def check_budgets(report: dict) -> list:
+    failures = []
+    for scale, data in report["scales"].items():
+        for name, r in data["benchmarks"].items():
+            if r.get("over_budget"):
+                failures.append(f"[{scale}] {r['over_budget']}")
+    return failures
+
+
+def compare(old: dict, new: dict):
+    for scale, data in new["scales"].items():
+        old_scale = old.get("scales", {}).get(scale)
+        if not old_scale:
+            continue
+        print(f"\n[{scale}] {old.get('commit')} -> {new.get('commit')}")
+        for name, r in data["benchmarks"].items():
+            o = old_scale["benchmarks"].get(name)
+            if not o:
+                continue
+            ratio = r["median_ms"] / o["median_ms"] if o["median_ms"] else float("inf")
+            flag = "⚠️" if ratio > 1.2 or r["queries"] > o["queries"] else "  "
+            print(
+                f"{flag} {name:32} {o['median_ms']:>10.2f}ms -> {r['median_ms']:>10.2f}ms "
+                f"({ratio:4.2f}x)  queries {o['queries']} -> {r['queries']}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark services and admin views.")
+    parser.add_argument("--scales", default="small,medium", help=f"comma list of {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON output path (default bench_results/<commit>.json)")
+    parser.add_argument("--compare", help="previous JSON result to compare against")
+    parser.add_argument("--check-budgets", action="store_true", help="exit 1 if a query budget is exceeded")
+    args = parser.parse_args()
+
+    commit = _git_sha()
+    report = {"commit": commit, "created_at": datetime.now().isoformat(timespec="seconds"), "scales": {}}
+
+    for name in args.scales.split(","):
+        name = name.strip()
+        print(f"⏱️  {name} ...")
+        report["scales"][name] = run_scale(name, SCALES[name], args.repeat, args.seed)
+        for bench, r in report["scales"][name]["benchmarks"].items():
+            print(f"   {bench:32} {r['median_ms']:>10.2f}ms  {r['queries']:>5} queries")
+
+    output = args.output or os.path.join("bench_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+    if args.check_budgets:
+        failures = check_budgets(report)
+        for line in failures:
+            print(f"❌ {line}")
+        if failures:
+            sys.exit(1)
+        print("✅ All query budgets met.")
+
+
+if __name__ == "__main__":
+    main()
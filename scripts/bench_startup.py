@@ -0,0 +1,79 @@
+"""
+Cold start timings: what a fresh gunicorn worker or a serverless cold
+start pays before it can answer its first request.
+
+    python -m scripts.bench_startup --repeat 10
+
+Every run is a new interpreter, timing:
+- import_ms        `import app` (Flask, SQLAlchemy, models, config)
+- create_app_ms    the app factory
+- first_request_ms POST /cron/ping through the test client
+It also reports whether the Twilio SDK got imported along the way.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+flask_app = app.create_app()
+t2 = time.perf_counter()
+client = flask_app.test_client()
+client.post("/cron/ping", headers={"X-CRON-SECRET": flask_app.config["CRON_SECRET"]})
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "twilio_imported": "twilio" in sys.modules,
+    "modules": len(sys.modules),
+}))
+"""
+
+KEYS = ["import_ms", "create_app_ms", "first_request_ms"]
+
+
+def run_once(env: dict) -> dict:
+    out = subprocess.check_output([sys.executable, "-c", PROBE], env=env, text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure interpreter cold start of the app.")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--mode", default="fake", help="WHATSAPP_MODE for the probe (fake|real)")
+    parser.add_argument("--auto-init", action="store_true", help="also run create_all/migrations at startup")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-startup-")
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, 'startup.db')}")
+    env["WHATSAPP_MODE"] = args.mode
+    env["DB_AUTO_INIT"] = "1" if args.auto_init else "0"
+    if args.mode == "real":
+        env.setdefault("TWILIO_ACCOUNT_SID", "ACbench")
+        env.setdefault("TWILIO_AUTH_TOKEN", "bench")
+        env.setdefault("TWILIO_WHATSAPP_FROM", "whatsapp:+10000000000")
+
+    run_once(env)  # warm the OS file cache and .pyc files
+    runs = [run_once(env) for _ in range(args.repeat)]
+
+    print(f"⏱️  {args.repeat} cold starts (mode={args.mode}, auto_init={args.auto_init})")
+    for key in KEYS:
+        values = [r[key] for r in runs]
+        print(f"   {key:18} median {statistics.median(values):8.1f}ms   max {max(values):8.1f}ms")
+
+    total = [sum(r[k] for k in KEYS) for r in runs]
+    print(f"   {'total':18} median {statistics.median(total):8.1f}ms")
+    print(f"   modules loaded: {runs[-1]['modules']}, twilio imported: {runs[-1]['twilio_imported']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import sys
+from app import create_app
+from app.migrations import current_version, init_db
+from app.query_plans import check_query_plans
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        applied = init_db()
+        if applied:
+            print(f"✅ Applied migrations: {', '.join(str(v) for v in applied)}")
+        else:
+            print("Schema already up to date.")
+        print(f"Schema version: {current_version()}")
+
+        if "--check-plans" in sys.argv:
+            failures = check_query_plans()
+            for name, details in failures:
+                print(f"❌ Full table scan: {name}")
+                for line in details:
+                    print(f"    {line}")
+            if failures:
+                sys.exit(1)
+            print("✅ All hot queries use indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import time
+from app import create_app
+from app.config import Config
+from app.services.outbox import drain_outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send queued WhatsApp messages from the outbox.")
+    parser.add_argument("--once", action="store_true", help="drain what is due and exit")
+    parser.add_argument("--batch-size", type=int, default=Config.OUTBOX_BATCH_SIZE)
+    parser.add_argument("--poll", type=float, default=Config.OUTBOX_POLL_SECONDS)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        while True:
+            totals = drain_outbox(batch_size=args.batch_size)
+            if totals["batches"]:
+                print(
+                    f"📤 sent={totals['sent']} retry={totals['retry']} "
+                    f"failed={totals['failed']} batches={totals['batches']}"
+                )
+
+            if args.once:
+                break
+            time.sleep(args.poll)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import logging
+from datetime import datetime
+from app import create_app
+from app.services.event_scheduler import EventScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run reminders and weekly generation exactly when due.")
+    parser.add_argument("--next", type=int, metavar="N", help="print the next N wake-ups and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    app = create_app()
+    scheduler = EventScheduler(app)
+
+    if args.next:
+        after = datetime.now()
+        for _ in range(args.next):
+            after, tasks = scheduler.next_event(after)
+            print(f"⏰ {after:%a %Y-%m-%d %H:%M}  {', '.join(tasks)}")
+        return
+
+    print("⏰ Scheduler running (Ctrl+C to stop).")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,26 @@ import json
 from datetime import date
 from app import create_app
 from app.extensions import db
-from app.models import User, Chore, Debt, Absence
+from app.migrations import init_db
+from app.models import User, Chore, Absence
+from app.services.debts import ensure_debt_rows
+from app.services.households import get_default_household
 
 
-def upsert_user(name: str, phone: str):
-    u = User.query.filter_by(name=name).first()
+def upsert_user(household_id: int, name: str, phone: str):
+    u = User.query.filter_by(household_id=household_id, name=name).first()
     if u:
         u.phone_e164 = phone
         u.is_active = True
         return u
 
-    u = User(name=name, phone_e164=phone, is_active=True)
+    u = User(household_id=household_id, name=name, phone_e164=phone, is_active=True)
     db.session.add(u)
     return u
 
 
-def upsert_chore(name: str, frequency_type: str, day_of_week: int, reminder_rules: list):
-    c = Chore.query.filter_by(name=name).first()
+def upsert_chore(household_id: int, name: str, frequency_type: str, day_of_week: int, reminder_rules: list):
+    c = Chore.query.filter_by(household_id=household_id, name=name).first()
     if c:
         c.frequency_type = frequency_type
         c.day_of_week = day_of_week
@@ -26,6 +29,7 @@ def upsert_chore(name: str, frequency_type: str, day_of_week: int, reminder_rule
         return c
 
     c = Chore(
+        household_id=household_id,
         name=name,
         frequency_type=frequency_type,
         day_of_week=day_of_week,
@@ -36,11 +40,7 @@ def upsert_chore(name: str, frequency_type: str, day_of_week: int, reminder_rule
 
 
 def ensure_debts(users, chores):
-    for u in users:
-        for c in chores:
-            existing = Debt.query.filter_by(user_id=u.id, chore_id=c.id).first()
-            if not existing:
-                db.session.add(Debt(user_id=u.id, chore_id=c.id, debt_count=0))
+    ensure_debt_rows((u.id, c.id) for u in users for c in chores)
 
 
 def upsert_absence(user_id: int, start: date, end: date, reason: str | None = None):
@@ -68,15 +68,18 @@ def upsert_absence(user_id: int, start: date, end: date, reason: str | None = No
 def main():
     app = create_app()
     with app.app_context():
+        init_db()
+        household_id = get_default_household().id
+
         # ---------------- USERS ----------------
         # For testing: same phone number for everyone is OK
         # (since you removed unique=True)
         users = [
-            upsert_user("Sashi", "+16476854531"),
-            upsert_user("Raja", "+16476854531"),
-            upsert_user("Guru", "+16476854531"),
-            upsert_user("Naveen", "+16476854531"),
-            upsert_user("Veenus", "+16476854531"),
+            upsert_user(household_id, "Sashi", "+16476854531"),
+            upsert_user(household_id, "Raja", "+16476854531"),
+            upsert_user(household_id, "Guru", "+16476854531"),
+            upsert_user(household_id, "Naveen", "+16476854531"),
+            upsert_user(household_id, "Veenus", "+16476854531"),
         ]
 
         db.session.commit()
@@ -85,6 +88,7 @@ def main():
         chores = [
             # Garbage: weekly Friday
             upsert_chore(
+                household_id=household_id,
                 name="Garbage Cleanup",
                 frequency_type="weekly",
                 day_of_week=4,  # Friday
@@ -97,6 +101,7 @@ def main():
 
             # Washroom: biweekly Sunday
             upsert_chore(
+                household_id=household_id,
                 name="Washroom Cleaning",
                 frequency_type="biweekly",
                 day_of_week=6,  # Sunday
@@ -107,6 +112,7 @@ def main():
 
             # Kitchen: biweekly Sunday
             upsert_chore(
+                household_id=household_id,
                 name="Kitchen Cleaning",
                 frequency_type="biweekly",
                 day_of_week=6,  # Sunday
@@ -0,0 +1,205 @@
+"""
+Seeded synthetic data for load testing.
+
+    python -m scripts.synthetic_data --users 200 --chores 40 --years 3
+
+Everything is generated from one random seed, so the same arguments always
+produce the same database. Rows are written with bulk inserts.
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, timedelta
+from app import create_app
+from app.extensions import db
+from app.migrations import init_db
+from app.models import (
+    Household, User, Chore, Assignment, Debt, Absence, ReminderLog, ChoreUserExclusion
+)
+
+CHUNK = 5000
+
+RULE_CHOICES = [
+    {"key": "monday", "dow": 0, "hour": 9},
+    {"key": "wednesday", "dow": 2, "hour": 18},
+    {"key": "thursday", "dow": 3, "hour": 19},
+    {"key": "friday", "dow": 4, "hour": 10},
+    {"key": "sunday", "dow": 6, "hour": 14},
+]
+
+
+def _bulk_insert(model, rows):
+    for i in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(model), rows[i:i + CHUNK])
+
+
+def generate(
+    seed: int = 1,
+    households: int = 1,
+    users: int = 10,
+    chores: int = 5,
+    years: float = 1,
+    absences_per_user: int = 2,
+    exclusions: int = 5,
+    reminder_logs: int = 1000,
+    today: date | None = None,
+) -> dict:
+    """
+    Adds `households` households, each with `users` users and `chores`
+    chores, plus `years` of weekly assignment history ending last week.
+    exclusions and reminder_logs are per household.
+    Returns the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    if not today:
+        today = date.today()
+
+    this_week = today - timedelta(days=today.weekday())
+    history_weeks = int(years * 52)
+    now = datetime.now()
+    counts = {}
+
+    household_rows = [
+        {"name": f"Synthetic House {seed}-{h}", "group_chat_name": f"House {h} chat",
+         "is_active": True, "created_at": now}
+        for h in range(households)
+    ]
+    _bulk_insert(Household, household_rows)
+    household_ids = [
+        row.id for row in db.session.query(Household.id)
+        .filter(Household.name.like(f"Synthetic House {seed}-%"))
+        .order_by(Household.id.asc())
+        .all()
+    ]
+    counts["household"] = len(household_ids)
+
+    user_rows, chore_rows = [], []
+    for household_id in household_ids:
+        for i in range(users):
+            user_rows.append({
+                "household_id": household_id, "name": f"User {i}", "phone_e164": f"+1555{i:07d}",
+                "is_active": rng.random() > 0.05, "created_at": now,
+            })
+        for i in range(chores):
+            rules = rng.sample(RULE_CHOICES, rng.randint(1, 3))
+            chore_rows.append({
+                "household_id": household_id, "name": f"Chore {i}",
+                "frequency_type": rng.choice(["weekly", "weekly", "biweekly"]),
+                "day_of_week": rng.randint(0, 6), "reminder_rules_json": json.dumps(rules),
+                "created_at": now,
+            })
+    _bulk_insert(User, user_rows)
+    _bulk_insert(Chore, chore_rows)
+    counts["user"] = len(user_rows)
+    counts["chore"] = len(chore_rows)
+
+    users_by_household, chores_by_household = {}, {}
+    for user_id, household_id in (
+        db.session.query(User.id, User.household_id).filter(User.household_id.in_(household_ids)).all()
+    ):
+        users_by_household.setdefault(household_id, []).append(user_id)
+    for chore_id, household_id, day_of_week, rules_json in (
+        db.session.query(Chore.id, Chore.household_id, Chore.day_of_week, Chore.reminder_rules_json)
+        .filter(Chore.household_id.in_(household_ids)).all()
+    ):
+        chores_by_household.setdefault(household_id, []).append((chore_id, day_of_week, json.loads(rules_json)))
+
+    assignment_rows, debt_rows, absence_rows, exclusion_rows = [], [], [], []
+    for household_id in household_ids:
+        user_ids = users_by_household[household_id]
+
+        for w in range(history_weeks, 0, -1):
+            week_start = this_week - timedelta(weeks=w)
+            for chore_id, day_of_week, _ in chores_by_household[household_id]:
+                status = rng.choices(["done", "missed", "reassigned"], weights=[85, 10, 5])[0]
+                due_date = week_start + timedelta(days=day_of_week)
+                assignment_rows.append({
+                    "household_id": household_id, "chore_id": chore_id, "user_id": rng.choice(user_ids),
+                    "week_start_date": week_start, "due_date": due_date, "status": status,
+                    "previous_user_ids_json": "[]", "created_at": now,
+                    "completed_at": datetime.combine(due_date, datetime.min.time()) if status == "done" else None,
+                })
+
+        for user_id in user_ids:
+            for chore_id, _, _ in chores_by_household[household_id]:
+                debt_rows.append({"user_id": user_id, "chore_id": chore_id, "debt_count": rng.choice([0, 0, 0, 1, 2])})
+
+            for _ in range(absences_per_user):
+                start = this_week - timedelta(days=rng.randint(-60, max(1, history_weeks * 7)))
+                absence_rows.append({
+                    "user_id": user_id, "start_date": start,
+                    "end_date": start + timedelta(days=rng.randint(1, 21)), "reason": "synthetic",
+                })
+
+        pairs = [(c, u) for c, _, _ in chores_by_household[household_id] for u in user_ids]
+        for chore_id, user_id in rng.sample(pairs, min(exclusions, len(pairs))):
+            exclusion_rows.append({"chore_id": chore_id, "user_id": user_id})
+
+    _bulk_insert(Assignment, assignment_rows)
+    _bulk_insert(Debt, debt_rows)
+    _bulk_insert(Absence, absence_rows)
+    _bulk_insert(ChoreUserExclusion, exclusion_rows)
+    counts["assignment"] = len(assignment_rows)
+    counts["debt"] = len(debt_rows)
+    counts["absence"] = len(absence_rows)
+    counts["chore_user_exclusion"] = len(exclusion_rows)
+
+    # reminder logs: distinct (assignment, rule key) pairs from the history
+    rules_by_chore = {
+        chore_id: [r["key"] for r in rules]
+        for chores_list in chores_by_household.values()
+        for chore_id, _, rules in chores_list
+    }
+    log_rows = []
+    for household_id in household_ids:
+        history = (
+            db.session.query(Assignment.id, Assignment.chore_id, Assignment.due_date)
+            .filter(Assignment.household_id == household_id)
+            .all()
+        )
+        candidates = [(a_id, key, due) for a_id, chore_id, due in history for key in rules_by_chore[chore_id]]
+        for a_id, key, due in rng.sample(candidates, min(reminder_logs, len(candidates))):
+            log_rows.append({
+                "assignment_id": a_id, "reminder_key": key,
+                "sent_at": datetime.combine(due, datetime.min.time()) - timedelta(hours=rng.randint(1, 96)),
+            })
+    _bulk_insert(ReminderLog, log_rows)
+    counts["reminder_log"] = len(log_rows)
+
+    db.session.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the database with seeded synthetic data.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--households", type=int, default=1)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--chores", type=int, default=5)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--absences-per-user", type=int, default=2)
+    parser.add_argument("--exclusions", type=int, default=5)
+    parser.add_argument("--reminder-logs", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        init_db()
+        counts = generate(
+            seed=args.seed,
+            households=args.households,
+            users=args.users,
+            chores=args.chores,
+            years=args.years,
+            absences_per_user=args.absences_per_user,
+            exclusions=args.exclusions,
+            reminder_logs=args.reminder_logs,
+        )
+
+    print("✅ Synthetic data generated.")
+    for table, n in counts.items():
+        print(f"{table}: {n}")
+
+
+if __name__ == "__main__":
+    main()